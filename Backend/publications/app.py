@@ -4,6 +4,10 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from routes import publications_bp
 from models import db
+from view_counter import view_counter
+from category_counters import reconciler
+from result_cache import result_cache
+from migrations import upgrade as upgrade_schema
 import os
 from flask_cors import CORS
 
@@ -22,16 +26,36 @@ def create_app():
     mysql_password = os.environ.get('MYSQL_PASSWORD', 'admin')
     mysql_database = os.environ.get('MYSQL_DATABASE', 'projet5_publications')
     
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'mysql+pymysql://{mysql_user}:{mysql_password}@{mysql_host}/{mysql_database}'
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+        'DATABASE_URL',
+        f'mysql+pymysql://{mysql_user}:{mysql_password}@{mysql_host}/{mysql_database}'
+    )
     
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
+    # Backend de recherche : 'fulltext' (MySQL) ou 'terms' (portable), auto-détecté si vide
+    app.config['SEARCH_BACKEND'] = os.environ.get('SEARCH_BACKEND')
+    
+    # Compteur de vues : écriture par lots toutes les N secondes ou au-delà d'un seuil
+    app.config['VIEW_COUNT_FLUSH_INTERVAL'] = float(os.environ.get('VIEW_COUNT_FLUSH_INTERVAL', 10))
+    app.config['VIEW_COUNT_FLUSH_THRESHOLD'] = int(os.environ.get('VIEW_COUNT_FLUSH_THRESHOLD', 500))
+    
+    # Réconciliation des compteurs par catégorie (secondes, 0 pour désactiver le job)
+    app.config['CATEGORY_COUNTERS_RECONCILE_INTERVAL'] = float(os.environ.get('CATEGORY_COUNTERS_RECONCILE_INTERVAL', 3600))
+    
+    # Cache des résultats : 'memory' (par processus) ou 'redis' (partagé), CACHE_TTL=0 pour désactiver
+    app.config['CACHE_BACKEND'] = os.environ.get('CACHE_BACKEND', 'memory')
+    app.config['CACHE_TTL'] = float(os.environ.get('CACHE_TTL', 30))
+    app.config['CACHE_MAX_ENTRIES'] = int(os.environ.get('CACHE_MAX_ENTRIES', 2048))
+    app.config['CACHE_REDIS_URL'] = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    
     # Configuration JWT
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = False  # Token n'expire pas (pour le dev)
     
     # Initialisation des extensions
     db.init_app(app)
     jwt = JWTManager(app)
+    result_cache.init_app(app)
     
     # Configuration CORS pour permettre les requêtes cross-origin
     CORS(app, origins=["http://localhost:3000", "http://127.0.0.1:3000"], supports_credentials=True)
@@ -57,6 +81,11 @@ def create_app():
     def health_check():
         return {'status': 'OK', 'service': 'publications'}, 200
     
+    # Statistiques du cache (succès, échecs, évictions) pour ajuster TTL et taille
+    @app.route('/cache/stats')
+    def cache_stats():
+        return result_cache.stats(), 200
+    
     # Route d'information sur le service
     @app.route('/api/info')
     def service_info():
@@ -77,11 +106,50 @@ def create_app():
             }
         }, 200
     
+    # Reconstruction de l'index de recherche : flask --app app rebuild-search-index
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        from search_index import rebuild_index
+        count = rebuild_index()
+        print(f"Index de recherche reconstruit : {count} publications indexées")
+    
+    # Réconciliation manuelle des compteurs : flask --app app reconcile-category-counters
+    @app.cli.command('reconcile-category-counters')
+    def reconcile_category_counters():
+        from category_counters import reconcile
+        corrected = reconcile()
+        print(f"Compteurs de catégories réconciliés : {len(corrected)} corrigés")
+    
+    # Migrations de schéma des tables existantes : flask --app app migrate-schema
+    @app.cli.command('migrate-schema')
+    def migrate_schema():
+        from migrations import upgrade
+        for name, result in upgrade().items():
+            print(f"{name} : {result}")
+    
+    # Vérification des plans d'exécution : flask --app app check-query-plans
+    @app.cli.command('check-query-plans')
+    def check_plans():
+        from query_plans import check_query_plans
+        failures = check_query_plans(app)
+        for name, statement, scans in failures:
+            print(f"❌ {name}\n   {statement}\n   {'; '.join(scans)}")
+        if failures:
+            raise SystemExit(1)
+        print("✅ Aucun parcours complet de la table publications")
+    
     # Création des tables de base de données
     with app.app_context():
         db.create_all()
+        upgrade_schema()
         print("Tables de base de données créées avec succès!")
     
+    # Démarrage de l'écriture différée des compteurs de vues
+    view_counter.init_app(app)
+    
+    # Compteurs par catégorie : réconciliation au démarrage puis périodique
+    reconciler.init_app(app)
+    
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,115 @@
+"""
+Benchmark de la sérialisation d'une page de publications
+
+Compare, pour une page de la liste :
+- le chemin ORM : instances Publication + to_dict() + jsonify
+- le chemin projeté : colonnes en tuples + row_to_dict() + json_response
+
+et affiche la latence moyenne par page et les allocations (tracemalloc).
+
+Usage :
+    python bench_serialization.py [--rows 5000] [--per-page 50] [--iterations 200]
+
+Par défaut la base est une base SQLite temporaire remplie de données
+synthétiques ; DATABASE_URL permet de viser une base existante.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+
+def _setup_database(rows):
+    from models import db, Publication
+
+    if Publication.query.count() >= rows:
+        return
+    categories = Publication.get_valid_categories()
+    for start in range(0, rows, 1000):
+        db.session.add_all([
+            Publication(
+                title=f'Perceuse à percussion {i}',
+                description='Perceuse sans fil 18V avec deux batteries et coffret de forets',
+                category=categories[i % len(categories)],
+                price_per_day=10 + i % 40,
+                deposit_required=50 if i % 3 == 0 else 0,
+                location='Paris',
+                owner_id=1 + i % 100,
+                images=[f'https://example.com/images/{i}/{n}.jpg' for n in range(3)]
+            )
+            for i in range(start, min(start + 1000, rows))
+        ])
+        db.session.commit()
+
+
+def _orm_page(per_page):
+    from flask import jsonify
+    from models import Publication
+
+    query = Publication.query.filter_by(is_active=True).order_by(Publication.created_at.desc())
+    publications = query.limit(per_page).all()
+    return jsonify({'publications': [pub.to_dict() for pub in publications]}).get_data()
+
+
+def _projected_page(per_page):
+    from models import Publication
+    from serialization import project, row_to_dict, json_response
+
+    query = Publication.query.filter_by(is_active=True).order_by(Publication.created_at.desc())
+    rows = project(query).limit(per_page).all()
+    return json_response({'publications': [row_to_dict(row) for row in rows]}).get_data()
+
+
+def _measure(page, per_page, iterations):
+    from models import db
+
+    page(per_page)  # préchauffage
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        page(per_page)
+        db.session.expunge_all()
+    latency = (time.perf_counter() - start) / iterations
+
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    page(per_page)
+    snapshot_after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.session.expunge_all()
+
+    stats = snapshot_after.compare_to(snapshot_before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    return latency, peak, blocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--per-page', type=int, default=50)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    if 'DATABASE_URL' not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    os.environ.setdefault('CATEGORY_COUNTERS_RECONCILE_INTERVAL', '0')
+
+    from app import create_app
+    from serialization import orjson
+
+    app = create_app()
+    with app.test_request_context():
+        _setup_database(args.rows)
+
+        print(f"Encodeur JSON du chemin projeté : {'orjson' if orjson else 'json (stdlib)'}")
+        print(f"{'chemin':<12}{'latence/page':>16}{'pic mémoire':>16}{'blocs alloués':>16}")
+        for name, page in (('orm', _orm_page), ('projeté', _projected_page)):
+            latency, peak, blocks = _measure(page, args.per_page, args.iterations)
+            print(f"{name:<12}{latency * 1000:>13.3f} ms{peak / 1024:>13.1f} Ko{blocks:>16}")
+
+
+if __name__ == '__main__':
+    main()
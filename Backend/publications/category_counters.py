@@ -0,0 +1,171 @@
+"""
+Compteurs matérialisés de publications par catégorie
+
+GET /publications/categories lisait ces chiffres par un `GROUP BY category`
+sur toute la table à chaque appel. Les compteurs sont désormais stockés dans
+la table category_counters et ajustés dans la même transaction que chaque
+changement d'état d'une publication (création, modification, disponibilité,
+suppression) :
+
+    UPDATE category_counters SET count = count + :delta WHERE category = :c
+
+Une publication est comptée si elle est active et disponible. Un job
+périodique recalcule les compteurs depuis la table publications pour
+corriger toute dérive (écritures hors API, incidents).
+"""
+import threading
+
+from models import db, Publication, CategoryCounter
+
+# Intervalle entre deux réconciliations (secondes)
+DEFAULT_RECONCILE_INTERVAL = 3600
+
+
+def counted_category(publication):
+    """
+    Retourne la catégorie sous laquelle une publication est comptée
+
+    Args:
+        publication (Publication): Publication à examiner
+
+    Returns:
+        str: Catégorie, ou None si la publication n'est pas comptée
+    """
+    if publication.is_active and publication.is_available:
+        return publication.category
+    return None
+
+
+def _adjust(category, delta):
+    # Si la ligne de la catégorie n'existe pas encore, l'UPDATE n'a aucun
+    # effet : la prochaine réconciliation la créera avec le bon total
+    db.session.execute(
+        db.update(CategoryCounter)
+        .where(CategoryCounter.category == category)
+        .values(count=CategoryCounter.count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def apply_transition(before, after):
+    """
+    Répercute un changement d'état sur les compteurs (à appeler avant le commit)
+
+    Args:
+        before (str): Catégorie comptée avant le changement (None si aucune)
+        after (str): Catégorie comptée après le changement (None si aucune)
+    """
+    if before == after:
+        return
+    deltas = {}
+    if before is not None:
+        deltas[before] = -1
+    if after is not None:
+        deltas[after] = 1
+    # Lignes verrouillées dans l'ordre des catégories : deux changements de
+    # catégorie croisés (A -> B et B -> A) ne peuvent pas s'interbloquer
+    for category in sorted(deltas):
+        _adjust(category, deltas[category])
+
+
+def get_counts():
+    """
+    Lit les compteurs, sans parcourir la table publications
+
+    Returns:
+        dict: Catégorie -> nombre de publications actives et disponibles
+    """
+    counts = {category: 0 for category in Publication.get_valid_categories()}
+    for counter in CategoryCounter.query.all():
+        if counter.category in counts:
+            counts[counter.category] = max(counter.count, 0)
+    return counts
+
+
+def reconcile():
+    """
+    Recalcule tous les compteurs depuis la table publications
+
+    Les lignes des compteurs sont verrouillées (FOR UPDATE, dans l'ordre des
+    catégories comme apply_transition) avant le comptage
+    et jusqu'au commit : une écriture concurrente attend la fin de la
+    réconciliation pour appliquer son +1/-1, au lieu d'être écrasée par
+    le total calculé avant elle. Le comptage étant la première lecture non
+    verrouillante de la transaction, l'image MySQL (REPEATABLE READ) est prise
+    après l'obtention des verrous.
+
+    Returns:
+        dict: Catégories dont le compteur a été corrigé -> (ancien, nouveau)
+    """
+    counters = {
+        counter.category: counter
+        for counter in CategoryCounter.query.order_by(CategoryCounter.category).with_for_update().all()
+    }
+    actual = dict(
+        db.session.query(
+            Publication.category,
+            db.func.count(Publication.id)
+        ).filter(
+            Publication.is_active == True,
+            Publication.is_available == True
+        ).group_by(Publication.category).all()
+    )
+    for category in Publication.get_valid_categories():
+        actual.setdefault(category, 0)
+
+    corrected = {}
+    for category, count in actual.items():
+        counter = counters.get(category)
+        if counter is None:
+            db.session.add(CategoryCounter(category=category, count=count))
+            corrected[category] = (None, count)
+        elif counter.count != count:
+            corrected[category] = (counter.count, count)
+            counter.count = count
+
+    db.session.commit()
+    return corrected
+
+
+class CategoryCounterReconciler:
+    """
+    Job d'arrière-plan qui réconcilie les compteurs à intervalle régulier
+    """
+
+    def __init__(self, interval=DEFAULT_RECONCILE_INTERVAL):
+        self.interval = interval
+        self._thread = None
+        self._stop = threading.Event()
+        self._app = None
+
+    def init_app(self, app):
+        """
+        Réconcilie une première fois puis démarre le job périodique
+
+        Args:
+            app (Flask): Application dont le contexte est utilisé
+        """
+        self.interval = app.config.get('CATEGORY_COUNTERS_RECONCILE_INTERVAL', self.interval)
+        self._app = app
+
+        self.run_once()
+        if self._thread is None and self.interval:
+            self._thread = threading.Thread(target=self._run, name='category-counters-reconcile', daemon=True)
+            self._thread.start()
+
+    def run_once(self):
+        with self._app.app_context():
+            try:
+                corrected = reconcile()
+                if corrected:
+                    self._app.logger.info(f"Compteurs de catégories corrigés: {corrected}")
+            except Exception as e:
+                db.session.rollback()
+                self._app.logger.warning(f"Réconciliation des compteurs de catégories échouée: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+
+reconciler = CategoryCounterReconciler()
@@ -0,0 +1,162 @@
+"""
+Migrations de schéma du service publications
+
+Le service crée ses tables avec `db.create_all()`, qui n'altère jamais une
+table existante. Les évolutions de schéma des tables déjà déployées sont
+donc appliquées ici, de façon idempotente : chaque étape inspecte la base et
+ne fait rien si elle a déjà été appliquée. upgrade() est appelé au démarrage
+et disponible via `flask --app app migrate-schema`.
+"""
+import json
+
+from sqlalchemy import inspect, text
+
+from models import db, Publication, PublicationSearchTerm, PublicationSearchDocument
+
+# Nombre de lignes converties par transaction lors des migrations de données
+MIGRATION_BATCH_SIZE = 500
+
+
+def _columns(table_name):
+    return {column['name'] for column in inspect(db.engine).get_columns(table_name)}
+
+
+def _indexes(table_name):
+    return {index['name'] for index in inspect(db.engine).get_indexes(table_name)}
+
+
+def _parse_legacy_images(raw):
+    try:
+        images = json.loads(raw) if raw else []
+    except (TypeError, ValueError):
+        return []
+    return images if isinstance(images, list) else []
+
+
+def migrate_images_to_json(batch_size=MIGRATION_BATCH_SIZE):
+    """
+    Remplace la colonne TEXT `images` (JSON sérialisé) par la colonne JSON
+    native `image_urls` et le compteur indexé `image_count`
+
+    Les lignes existantes sont converties par lots ; l'ancienne colonne est
+    conservée (non mappée) pour permettre un retour arrière.
+
+    Returns:
+        int: Nombre de publications converties
+    """
+    columns = _columns('publications')
+    json_type = 'JSON' if db.engine.dialect.name in ('mysql', 'postgresql', 'sqlite') else 'TEXT'
+
+    with db.engine.begin() as connection:
+        if 'image_urls' not in columns:
+            connection.execute(text(f'ALTER TABLE publications ADD COLUMN image_urls {json_type}'))
+        if 'image_count' not in columns:
+            connection.execute(text('ALTER TABLE publications ADD COLUMN image_count INTEGER NOT NULL DEFAULT 0'))
+    if 'ix_publications_image_count' not in _indexes('publications'):
+        db.Index('ix_publications_image_count', Publication.image_count).create(db.engine)
+
+    if 'images' not in columns:
+        return 0
+
+    # Conversion des lignes non encore migrées (image_urls NULL)
+    converted = 0
+    last_id = 0
+    while True:
+        with db.engine.begin() as connection:
+            rows = connection.execute(
+                text(
+                    'SELECT id, images FROM publications '
+                    'WHERE image_urls IS NULL AND id > :last_id ORDER BY id LIMIT :limit'
+                ),
+                {'last_id': last_id, 'limit': batch_size}
+            ).all()
+            if not rows:
+                break
+
+            params = []
+            for publication_id, raw in rows:
+                images = _parse_legacy_images(raw)
+                params.append({
+                    'id': publication_id,
+                    'image_urls': json.dumps(images),
+                    'image_count': len(images)
+                })
+            connection.execute(
+                text('UPDATE publications SET image_urls = :image_urls, image_count = :image_count WHERE id = :id'),
+                params
+            )
+
+        converted += len(rows)
+        last_id = rows[-1][0]
+
+    return converted
+
+
+def create_composite_indexes():
+    """
+    Crée les index composites de Publication.__table_args__ absents de la base
+
+    Returns:
+        list: Noms des index créés
+    """
+    existing = _indexes('publications')
+    created = []
+    for index in Publication.__table__.indexes:
+        if index.name not in existing and len(index.columns) > 1:
+            index.create(db.engine)
+            created.append(index.name)
+    return created
+
+
+def add_weekly_discount_column():
+    """
+    Ajoute la colonne `weekly_discount_percent` (règle de prix par article)
+
+    Returns:
+        bool: True si la colonne a été ajoutée
+    """
+    if 'weekly_discount_percent' in _columns('publications'):
+        return False
+    with db.engine.begin() as connection:
+        connection.execute(text('ALTER TABLE publications ADD COLUMN weekly_discount_percent NUMERIC(5, 2) DEFAULT 0'))
+    return True
+
+
+def build_search_index():
+    """
+    Construit l'index de recherche des publications existantes
+
+    La recherche par mots-clés ne lit que l'index : sans cette étape, les
+    publications créées avant son introduction n'y apparaîtraient pas. L'index
+    n'est construit que s'il est vide alors que des publications actives
+    existent ; il est ensuite tenu à jour à chaque écriture.
+
+    Returns:
+        int: Nombre de publications indexées (0 si l'index était déjà rempli)
+    """
+    from search_index import get_backend, rebuild_index, FullTextBackend
+
+    index_model = PublicationSearchDocument if get_backend().name == FullTextBackend.name else PublicationSearchTerm
+    if db.session.query(index_model.query.exists()).scalar():
+        return 0
+    if not db.session.query(Publication.query.filter(Publication.is_active == True).exists()).scalar():
+        return 0
+    return rebuild_index()
+
+
+MIGRATIONS = [
+    migrate_images_to_json,
+    create_composite_indexes,
+    add_weekly_discount_column,
+    build_search_index,
+]
+
+
+def upgrade():
+    """
+    Applique toutes les migrations dans l'ordre
+
+    Returns:
+        dict: Nom de la migration -> résultat
+    """
+    return {migration.__name__: migration() for migration in MIGRATIONS}
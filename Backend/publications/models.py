@@ -1,6 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import validates
 from datetime import datetime
-import json
 
 db = SQLAlchemy()
 
@@ -11,6 +11,29 @@ class Publication(db.Model):
     """
     __tablename__ = 'publications'
     
+    # Index composites dérivés des combinaisons filtre/tri réelles de
+    # GET /publications et de la recherche avancée (is_active toujours filtré,
+    # puis disponibilité, catégorie, et enfin la colonne de tri ou de plage).
+    # L'id final rend l'ordre stable pour la pagination par curseur.
+    # Les bases existantes les reçoivent via migrations.create_composite_indexes
+    __table_args__ = (
+        db.Index('ix_publications_active_created', 'is_active', 'created_at', 'id'),
+        db.Index('ix_publications_active_available_created', 'is_active', 'is_available', 'created_at', 'id'),
+        db.Index('ix_publications_active_category_created', 'is_active', 'category', 'created_at', 'id'),
+        db.Index(
+            'ix_publications_active_available_category_created',
+            'is_active', 'is_available', 'category', 'created_at', 'id'
+        ),
+        db.Index('ix_publications_active_price', 'is_active', 'price_per_day', 'id'),
+        db.Index(
+            'ix_publications_active_available_category_price',
+            'is_active', 'is_available', 'category', 'price_per_day', 'id'
+        ),
+        # Filtre par lieu (LIKE '%...%', non indexable) : le lieu est lu dans
+        # l'index (comptage sans accès aux lignes) plutôt que dans la table
+        db.Index('ix_publications_active_location', 'is_active', 'location', 'id'),
+    )
+    
     # Clé primaire
     id = db.Column(db.Integer, primary_key=True)
     
@@ -22,6 +45,7 @@ class Publication(db.Model):
     # Informations de prix et location
     price_per_day = db.Column(db.Numeric(10, 2), nullable=False)
     deposit_required = db.Column(db.Numeric(10, 2), default=0)  # Caution éventuelle
+    weekly_discount_percent = db.Column(db.Numeric(5, 2), default=0)  # Remise sur les semaines complètes (%)
     location = db.Column(db.String(200), nullable=False, index=True)  # Ville/région
     
     # Propriétaire (référence vers le service User)
@@ -32,8 +56,11 @@ class Publication(db.Model):
     is_available = db.Column(db.Boolean, default=True, index=True)
     is_active = db.Column(db.Boolean, default=True, index=True)  # Pour soft delete
     
-    # Images (stockées comme JSON - liste d'URLs)
-    _images = db.Column('images', db.Text, default='[]')
+    # Images : liste d'URLs dans une colonne JSON native (plus de json.loads à
+    # chaque accès) et nombre d'images indexé pour filtrer les annonces avec photos.
+    # L'ancienne colonne TEXT `images` est migrée par migrations.upgrade()
+    images = db.Column('image_urls', db.JSON, nullable=False, default=list)
+    image_count = db.Column(db.Integer, nullable=False, default=0, index=True)
     
     # Métadonnées
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
@@ -46,31 +73,18 @@ class Publication(db.Model):
         """
         Constructeur de la publication
         """
-        # Gestion spéciale pour les images
-        if 'images' in kwargs:
-            self.images = kwargs.pop('images')
-        
+        kwargs.setdefault('images', [])
         super(Publication, self).__init__(**kwargs)
     
-    @property
-    def images(self):
-        """
-        Getter pour les images - convertit JSON en liste Python
-        """
-        try:
-            return json.loads(self._images) if self._images else []
-        except json.JSONDecodeError:
-            return []
-    
-    @images.setter
-    def images(self, value):
+    @validates('images')
+    def validate_images(self, key, value):
         """
-        Setter pour les images - convertit liste Python en JSON
+        Normalise les images (liste d'URLs) et tient à jour image_count
         """
-        if isinstance(value, list):
-            self._images = json.dumps(value)
-        else:
-            self._images = '[]'
+        if not isinstance(value, list):
+            value = []
+        self.image_count = len(value)
+        return value
     
     def to_dict(self, include_sensitive=False):
         """
@@ -91,7 +105,7 @@ class Publication(db.Model):
             'location': self.location,
             'condition': self.condition,
             'is_available': self.is_available,
-            'images': self.images,
+            'images': self.images or [],
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'view_count': self.view_count
@@ -102,21 +116,28 @@ class Publication(db.Model):
             base_dict.update({
                 'owner_id': self.owner_id,
                 'deposit_required': float(self.deposit_required) if self.deposit_required else 0,
+                'weekly_discount_percent': float(self.weekly_discount_percent) if self.weekly_discount_percent else 0,
                 'is_active': self.is_active
             })
         else:
             # Pour les autres utilisateurs, on inclut seulement la caution si elle existe
             if self.deposit_required and self.deposit_required > 0:
                 base_dict['deposit_required'] = float(self.deposit_required)
+            if self.weekly_discount_percent and self.weekly_discount_percent > 0:
+                base_dict['weekly_discount_percent'] = float(self.weekly_discount_percent)
         
         return base_dict
     
     def increment_view_count(self):
         """
-        Incrémente le compteur de vues de la publication
+        Enregistre une vue de la publication
+
+        La vue est mise en tampon et écrite plus tard par lots (voir
+        view_counter) : aucun commit n'est fait ici.
         """
-        self.view_count += 1
-        db.session.commit()
+        from view_counter import view_counter
+
+        view_counter.record(self.id)
     
     def is_owned_by(self, user_id):
         """
@@ -210,19 +231,15 @@ class Publication(db.Model):
         Returns:
             Query: Requête SQLAlchemy filtrée
         """
+        from search_index import search_publications
+
         query = cls.query.filter(
             cls.is_active == True,
             cls.is_available == True
         )
         
         if keywords:
-            search_term = f'%{keywords}%'
-            query = query.filter(
-                db.or_(
-                    cls.title.ilike(search_term),
-                    cls.description.ilike(search_term)
-                )
-            )
+            query = search_publications(query, keywords)
         
         if category:
             query = query.filter(cls.category == category.lower())
@@ -266,4 +283,59 @@ class Publication(db.Model):
         if limit:
             query = query.limit(limit)
         
-        return query
\ No newline at end of file
+        return query
+
+
+class PublicationSearchTerm(db.Model):
+    """
+    Entrée de l'index inversé de recherche : un terme normalisé présent
+    dans le titre ou la description d'une publication active
+    """
+    __tablename__ = 'publication_search_terms'
+
+    term = db.Column(db.String(64), primary_key=True)
+    publication_id = db.Column(
+        db.Integer,
+        db.ForeignKey('publications.id', ondelete='CASCADE'),
+        primary_key=True,
+        index=True
+    )
+    weight = db.Column(db.Integer, nullable=False, default=1)
+
+    def __repr__(self):
+        return f'<PublicationSearchTerm {self.term} -> {self.publication_id}>'
+
+
+class PublicationSearchDocument(db.Model):
+    """
+    Document de recherche normalisé d'une publication, indexé en FULLTEXT sur MySQL
+    """
+    __tablename__ = 'publication_search_documents'
+    __table_args__ = (
+        db.Index('ix_publication_search_documents_content', 'content', mysql_prefix='FULLTEXT'),
+    )
+
+    publication_id = db.Column(
+        db.Integer,
+        db.ForeignKey('publications.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    content = db.Column(db.Text, nullable=False)
+
+    def __repr__(self):
+        return f'<PublicationSearchDocument {self.publication_id}>'
+
+
+
+class CategoryCounter(db.Model):
+    """
+    Nombre de publications actives et disponibles d'une catégorie,
+    maintenu incrémentalement (voir category_counters)
+    """
+    __tablename__ = 'category_counters'
+
+    category = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<CategoryCounter {self.category}: {self.count}>'
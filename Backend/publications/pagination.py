@@ -0,0 +1,230 @@
+"""
+Pagination par curseur (keyset) des listes de publications
+
+Au lieu de `LIMIT ... OFFSET ...` (coût proportionnel à la profondeur de la
+page) et d'un `COUNT(*)` à chaque appel, une page est lue à partir de la
+dernière ligne de la page précédente :
+
+    WHERE (created_at, id) < (:dernier_created_at, :dernier_id)
+    ORDER BY created_at DESC, id DESC
+    LIMIT :per_page + 1
+
+Le curseur renvoyé au client est opaque (JSON encodé en base64 URL-safe) et
+contient le tri actif ainsi que la clé de la dernière ligne.
+
+Pour les exports volumineux, iter_ndjson parcourt tous les résultats par lots
+(curseur côté serveur) et produit une ligne JSON par publication.
+"""
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from models import db, Publication
+from serialization import project, row_to_dict, dumps
+
+# Tris supportés : nom -> (colonne, sens)
+SORTS = {
+    'date_desc': ('created_at', 'desc'),
+    'date_asc': ('created_at', 'asc'),
+    'price_asc': ('price_per_day', 'asc'),
+    'price_desc': ('price_per_day', 'desc')
+}
+
+DEFAULT_SORT = 'date_desc'
+
+# Durée de validité du total approximatif (secondes)
+COUNT_CACHE_TTL = 60
+COUNT_CACHE_MAX_ENTRIES = 1000
+
+# Nombre de lignes lues par lot en mode streaming
+STREAM_BATCH_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    """
+    Curseur illisible ou incompatible avec le tri demandé
+    """
+
+
+def _serialize_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _deserialize_value(column_name, value):
+    if column_name == 'created_at':
+        return datetime.fromisoformat(value)
+    if column_name == 'price_per_day':
+        return Decimal(value)
+    return value
+
+
+def encode_cursor(sort, value, last_id):
+    """
+    Construit le curseur opaque pointant après une ligne
+
+    Args:
+        sort (str): Tri actif (clé de SORTS)
+        value: Valeur de la colonne de tri pour la dernière ligne
+        last_id (int): Identifiant de la dernière ligne
+
+    Returns:
+        str: Curseur à renvoyer au client
+    """
+    payload = json.dumps([sort, _serialize_value(value), last_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    """
+    Décode un curseur produit par encode_cursor
+
+    Returns:
+        tuple: (valeur de la colonne de tri, identifiant)
+
+    Raises:
+        InvalidCursor: Si le curseur est corrompu ou ne correspond pas au tri
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        column_name, _ = SORTS[cursor_sort]
+        value = _deserialize_value(column_name, value)
+        last_id = int(last_id)
+    except (ValueError, TypeError, KeyError, InvalidOperation) as e:
+        raise InvalidCursor('Curseur invalide') from e
+
+    if cursor_sort != sort:
+        raise InvalidCursor('Le curseur ne correspond pas au tri demandé')
+    return value, last_id
+
+
+def keyset_page(query, sort, cursor, per_page):
+    """
+    Lit une page de résultats après le curseur donné
+
+    La requête ne doit pas être déjà triée : le tri (colonne, id) est
+    appliqué ici pour rester cohérent avec le curseur.
+
+    Args:
+        query (Query): Requête filtrée sur Publication
+        sort (str): Tri actif (clé de SORTS)
+        cursor (str): Curseur de la page précédente, None pour la première page
+        per_page (int): Nombre de résultats par page
+
+    Returns:
+        tuple: (liste de publications, curseur suivant ou None)
+    """
+    column_name, direction = SORTS[sort]
+    column = getattr(Publication, column_name)
+    keyset = db.tuple_(column, Publication.id)
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort)
+        if direction == 'desc':
+            query = query.filter(keyset < db.tuple_(value, last_id))
+        else:
+            query = query.filter(keyset > db.tuple_(value, last_id))
+
+    query = order_by_sort(query, sort)
+
+    # Une ligne de plus pour savoir s'il existe une page suivante
+    rows = query.limit(per_page + 1).all()
+    items = rows[:per_page]
+
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor(sort, getattr(last, column_name), last.id)
+
+    return items, next_cursor
+
+
+def order_by_sort(query, sort):
+    """
+    Applique le tri (colonne, id) correspondant à un tri de SORTS
+
+    Args:
+        query (Query): Requête filtrée sur Publication
+        sort (str): Tri actif (clé de SORTS)
+
+    Returns:
+        Query: Requête triée de façon stable
+    """
+    column_name, direction = SORTS[sort]
+    column = getattr(Publication, column_name)
+    if direction == 'desc':
+        return query.order_by(column.desc(), Publication.id.desc())
+    return query.order_by(column.asc(), Publication.id.asc())
+
+
+def iter_ndjson(query, batch_size=STREAM_BATCH_SIZE):
+    """
+    Parcourt tous les résultats d'une requête et produit du NDJSON
+
+    Les lignes sont lues par lots via un curseur côté serveur (yield_per) :
+    la mémoire utilisée reste bornée quel que soit le nombre de résultats.
+
+    Args:
+        query (Query): Requête triée sur Publication
+        batch_size (int): Nombre de lignes lues par lot
+
+    Yields:
+        bytes: Une publication sérialisée en JSON, terminée par un saut de ligne
+    """
+    rows = project(query).execution_options(stream_results=True).yield_per(batch_size)
+    for row in rows:
+        yield dumps(row_to_dict(row)) + b'\n'
+
+
+class ApproximateCounter:
+    """
+    Cache des totaux par jeu de filtres
+
+    Le total n'est recalculé qu'à l'expiration (COUNT_CACHE_TTL) : il peut
+    être légèrement décalé par rapport à la base, d'où le drapeau
+    `total_is_approximate` dans les réponses.
+    """
+
+    def __init__(self, ttl=COUNT_CACHE_TTL, max_entries=COUNT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def count(self, key, query):
+        """
+        Retourne le total pour un jeu de filtres, depuis le cache si possible
+
+        Args:
+            key (tuple): Clé normalisée du jeu de filtres
+            query (Query): Requête filtrée utilisée en cas d'absence dans le cache
+
+        Returns:
+            int: Nombre (approximatif) de résultats
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                return entry[0]
+
+        total = query.order_by(None).count()
+
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Purge des entrées expirées, puis des plus anciennes si nécessaire
+                self._entries = {k: v for k, v in self._entries.items() if v[1] > now}
+                while len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (total, now + self.ttl)
+        return total
+
+
+approximate_counter = ApproximateCounter()
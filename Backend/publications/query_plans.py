@@ -0,0 +1,204 @@
+"""
+Vérification des plans d'exécution des requêtes de liste et de recherche
+
+Chaque combinaison filtre/tri supportée est rejouée sur les vrais endpoints
+(client de test Flask) ; les requêtes SQL émises sur la table publications
+sont capturées puis passées à EXPLAIN. Une combinaison échoue si la base
+choisit un parcours complet de la table (ou d'un index entier), ou si elle
+n'utilise qu'un index booléen peu sélectif (is_active, is_available), ce qui
+revient en pratique à parcourir presque toute la table :
+- MySQL : EXPLAIN type ALL ou index, ou clé peu sélective, sur publications
+- SQLite : EXPLAIN QUERY PLAN « SCAN publications » ou index peu sélectif
+
+Usage :
+- `python -m pytest tests/test_query_plans.py` depuis Backend/publications,
+  une vérification par combinaison (SQLite temporaire, ou la base de
+  TEST_DATABASE_URL pour vérifier les plans MySQL)
+- `flask --app app check-query-plans` sur une base déployée (code de sortie 1
+  en cas de régression), après les migrations
+"""
+import itertools
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+from sqlalchemy import event
+
+from models import db
+from result_cache import result_cache
+
+# Index mono-colonne sur des booléens : leur usage seul signale une régression
+LOW_SELECTIVITY_INDEXES = frozenset([
+    'ix_publications_is_active',
+    'ix_publications_is_available'
+])
+
+# Valeurs testées pour chaque filtre de GET /publications (None = absent)
+LIST_FILTERS = {
+    'category': [None, 'bricolage', 'sport'],
+    'available_only': [None, 'true'],
+    'min_price': [None, '10'],
+    'max_price': [None, '50'],
+    'sort': ['date_desc', 'date_asc', 'price_asc', 'price_desc'],
+    'cursor': [None, ''],
+    'search': [None, 'perceuse'],
+    'location': [None, 'Paris']
+}
+
+# Corps testés pour POST /publications/search/advanced
+ADVANCED_SEARCHES = [
+    {},
+    {'category': 'bricolage'},
+    {'category': 'bricolage', 'min_price': 10, 'max_price': 50},
+    {'min_price': 10, 'max_price': 50, 'sort': 'price_asc'},
+    {'category': 'sport', 'cursor': '', 'sort': 'date_desc'},
+    {'category': 'sport', 'condition': ['bon', 'excellent']},
+    {'keywords': 'perceuse'},
+    {'keywords': 'perceuse', 'category': 'bricolage', 'location': 'Paris'},
+    {'keywords': 'perceuse', 'min_price': 10, 'sort': 'price_asc'},
+    {'keywords': 'perceuse', 'cursor': '', 'sort': 'date_desc'},
+    {'location': 'Paris'},
+    {'location': 'Paris', 'category': 'sport', 'max_price': 50},
+    {'location': 'Paris', 'cursor': '', 'sort': 'price_desc'},
+]
+
+
+def list_combinations():
+    """
+    Génère les paramètres de toutes les combinaisons de filtres de la liste
+
+    Yields:
+        dict: Paramètres de requête
+    """
+    names = list(LIST_FILTERS)
+    for values in itertools.product(*(LIST_FILTERS[name] for name in names)):
+        yield {name: value for name, value in zip(names, values) if value is not None}
+
+
+@contextmanager
+def capture_statements():
+    """
+    Capture les SELECT sur publications émis dans le bloc
+
+    Yields:
+        list: (SQL, paramètres) ajoutés au fil des requêtes
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'publications' in statement:
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def full_scans(statement, parameters):
+    """
+    Passe une requête à EXPLAIN et retourne les étapes de parcours complet
+
+    Args:
+        statement (str): SQL au format du driver
+        parameters: Paramètres du driver
+
+    Returns:
+        list: Descriptions des parcours complets sur publications
+    """
+    dialect = db.engine.dialect.name
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect == 'sqlite' else 'EXPLAIN '
+
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(prefix + statement, parameters)
+        columns = [column[0] for column in cursor.description]
+        plan = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        cursor.close()
+    finally:
+        connection.close()
+
+    scans = []
+    for step in plan:
+        if dialect == 'sqlite':
+            detail = step.get('detail', '')
+            if not detail.startswith(('SCAN publications', 'SEARCH publications')):
+                continue
+            index_name = detail.split('USING INDEX ')[-1].split(' ')[0] if 'USING INDEX ' in detail else None
+            if detail.startswith('SCAN') or index_name in LOW_SELECTIVITY_INDEXES:
+                scans.append(detail)
+        elif step.get('table') == 'publications' and (
+            step.get('type') in ('ALL', 'index') or step.get('key') in LOW_SELECTIVITY_INDEXES
+        ):
+            scans.append(f"type={step['type']} key={step.get('key')} rows={step.get('rows')}")
+    return scans
+
+
+def _send(client, method, path, payload):
+    if method == 'GET':
+        return client.get(path, query_string=payload)
+    return client.post(path, json=payload)
+
+
+def requests_to_check():
+    """
+    Liste les requêtes dont le plan est vérifié
+
+    Returns:
+        list: (nom, méthode, chemin, paramètres ou corps)
+    """
+    return [
+        ('GET /publications?' + urlencode(params), 'GET', '/publications', params)
+        for params in list_combinations()
+    ] + [
+        (f'POST /publications/search/advanced {body}', 'POST', '/publications/search/advanced', body)
+        for body in ADVANCED_SEARCHES
+    ]
+
+
+def check_request(app, client, method, path, payload):
+    """
+    Rejoue une requête (et sa page suivante en mode curseur) et vérifie les
+    plans de ses SELECT sur publications, cache des résultats désactivé
+
+    Returns:
+        list: (SQL, parcours complets) pour chaque régression ; (None, [HTTP ...])
+        si la requête échoue
+    """
+    failures = []
+    cache_enabled, result_cache.enabled = result_cache.enabled, False
+    try:
+        with app.app_context(), capture_statements() as statements:
+            response = _send(client, method, path, payload)
+            # En mode curseur, la page suivante exerce la comparaison (colonne, id)
+            next_cursor = response.status_code == 200 and response.get_json().get('next_cursor')
+            if next_cursor:
+                response = _send(client, method, path, dict(payload, cursor=next_cursor))
+            if response.status_code != 200:
+                return [(None, [f'HTTP {response.status_code}'])]
+            for statement, parameters in statements:
+                scans = full_scans(statement, parameters)
+                if scans:
+                    failures.append((statement, scans))
+    finally:
+        result_cache.enabled = cache_enabled
+    return failures
+
+
+def check_query_plans(app):
+    """
+    Rejoue toutes les combinaisons et vérifie leurs plans
+
+    Args:
+        app (Flask): Application configurée sur la base à vérifier
+
+    Returns:
+        list: (combinaison, SQL, parcours complets) pour chaque régression
+    """
+    client = app.test_client()
+    return [
+        (name, statement, scans)
+        for name, method, path, payload in requests_to_check()
+        for statement, scans in check_request(app, client, method, path, payload)
+    ]
@@ -0,0 +1,276 @@
+"""
+Cache des résultats des endpoints de lecture des publications
+
+Les listes, les détails et les statistiques par catégorie sont lus bien plus
+souvent qu'ils ne changent. Les réponses sont mises en cache avec une durée
+de vie (CACHE_TTL) et une éviction LRU (CACHE_MAX_ENTRIES), sous une clé
+construite à partir des filtres normalisés.
+
+Chaque entrée porte des tags ; les écritures n'invalident que les tags
+concernés :
+- 'publication:<id>' : détail d'une publication
+- 'category:<catégorie>' : listes pouvant contenir une publication de la catégorie
+- 'categories' : compteurs par catégorie
+
+Les résultats sont calculés hors du cache : une lecture qui a interrogé la
+base avant une écriture pourrait remettre en cache l'ancienne version après
+l'invalidation. Chaque invalidation incrémente une génération ; la route lit
+la génération avant la requête et la passe à set(), qui ignore la valeur si
+une invalidation a eu lieu entre-temps.
+
+Deux backends :
+- MemoryBackend : en mémoire, propre à chaque processus (par défaut)
+- RedisBackend : partagé entre processus (CACHE_BACKEND=redis, CACHE_REDIS_URL),
+  nécessite le paquet `redis`
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from serialization import dumps
+
+DEFAULT_TTL = 30
+DEFAULT_MAX_ENTRIES = 2048
+
+
+class MemoryBackend:
+    """
+    Cache LRU en mémoire avec expiration et index des tags
+    """
+    name = 'memory'
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.evictions = 0
+
+    def generation(self):
+        with self._lock:
+            return self._generation
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, _ = entry
+            if expires_at <= now:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, tags, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            while len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[key] = (value, time.monotonic() + self.ttl, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+    def invalidate(self, tags):
+        removed = 0
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+        return removed
+
+    def counters(self):
+        """
+        Évictions et nombre d'entrées
+        """
+        with self._lock:
+            return {'evictions': self.evictions, 'size': len(self._entries)}
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisBackend:
+    """
+    Cache partagé dans Redis : chaque tag est un ensemble des clés associées
+
+    L'éviction LRU est assurée par Redis (maxmemory-policy allkeys-lru) :
+    évictions et taille ne sont pas propres à ce cache et ne sont pas
+    rapportées. La génération est un compteur Redis, partagé par les
+    processus.
+    """
+    name = 'redis'
+    prefix = 'publications:cache:'
+
+    def __init__(self, url, ttl=DEFAULT_TTL):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError('CACHE_BACKEND=redis nécessite le paquet redis') from e
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url)
+        self._watch_error = redis.WatchError
+        self._generation_key = self.prefix + 'generation'
+
+    def generation(self):
+        return int(self._client.get(self._generation_key) or 0)
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, tags, generation=None):
+        with self._client.pipeline() as pipe:
+            try:
+                # La génération est surveillée : une invalidation concurrente annule l'écriture
+                pipe.watch(self._generation_key)
+                if generation is not None and int(pipe.get(self._generation_key) or 0) != generation:
+                    return
+                pipe.multi()
+                pipe.set(self.prefix + key, dumps(value), ex=max(1, int(self.ttl)))
+                for tag in tags:
+                    pipe.sadd(self.prefix + 'tag:' + tag, key)
+                    pipe.expire(self.prefix + 'tag:' + tag, max(1, int(self.ttl)))
+                pipe.execute()
+            except self._watch_error:
+                pass
+
+    def invalidate(self, tags):
+        removed = 0
+        self._client.incr(self._generation_key)
+        for tag in tags:
+            tag_key = self.prefix + 'tag:' + tag
+            keys = self._client.smembers(tag_key)
+            if keys:
+                removed += self._client.delete(*[self.prefix + key.decode('utf-8') for key in keys])
+            self._client.delete(tag_key)
+        return removed
+
+    def counters(self):
+        return {}
+
+
+class ResultCache:
+    """
+    Façade du cache utilisée par les routes, avec compteurs de succès/échecs
+    """
+
+    def __init__(self):
+        self.backend = MemoryBackend()
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configure le backend à partir de la configuration de l'application
+
+        Args:
+            app (Flask): Application (CACHE_BACKEND, CACHE_TTL, CACHE_MAX_ENTRIES, CACHE_REDIS_URL)
+        """
+        ttl = app.config.get('CACHE_TTL', DEFAULT_TTL)
+        self.enabled = bool(ttl)
+        if app.config.get('CACHE_BACKEND') == RedisBackend.name:
+            self.backend = RedisBackend(app.config['CACHE_REDIS_URL'], ttl=ttl)
+        else:
+            self.backend = MemoryBackend(ttl=ttl, max_entries=app.config.get('CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+
+    def get(self, key):
+        """
+        Retourne la valeur en cache, ou None en cas d'absence
+        """
+        if not self.enabled:
+            return None
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def generation(self):
+        """
+        Génération courante, à lire avant de calculer une valeur à mettre en cache
+        """
+        return self.backend.generation() if self.enabled else 0
+
+    def set(self, key, value, tags=(), generation=None):
+        """
+        Met une valeur (sérialisable en JSON) en cache
+
+        Args:
+            key (str): Clé normalisée
+            value: Valeur à mettre en cache
+            tags (iterable): Tags permettant l'invalidation
+            generation (int): Génération lue avant le calcul de la valeur ;
+                si une invalidation a eu lieu depuis, la valeur est ignorée
+        """
+        if self.enabled:
+            self.backend.set(key, value, tuple(tags), generation)
+
+    def invalidate(self, *tags):
+        """
+        Supprime toutes les entrées portant l'un des tags
+
+        Returns:
+            int: Nombre d'entrées supprimées
+        """
+        if not self.enabled:
+            return 0
+        return self.backend.invalidate(tags)
+
+    def stats(self):
+        """
+        Statistiques du cache pour ajuster TTL et taille
+
+        Returns:
+            dict: Backend, succès, échecs, taux de succès ; évictions et taille
+            pour le backend mémoire seulement
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'backend': self.backend.name,
+            'enabled': self.enabled,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / lookups, 4) if lookups else None,
+            **self.backend.counters()
+        }
+
+
+def make_key(namespace, params):
+    """
+    Construit une clé de cache indépendante de l'ordre des paramètres
+
+    Args:
+        namespace (str): Type de résultat ('list', 'detail', ...)
+        params (iterable): Couples (nom, valeur) des filtres
+
+    Returns:
+        str: Clé normalisée
+    """
+    return namespace + ':' + json.dumps(sorted(params), separators=(',', ':'))
+
+
+result_cache = ResultCache()
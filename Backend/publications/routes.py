@@ -1,7 +1,18 @@
-from flask import Blueprint, request, jsonify, abort
+from flask import Blueprint, request, jsonify, abort, Response, stream_with_context
 from models import db, Publication
+from search_index import index_publication, search_publications
+from pagination import (
+    SORTS, DEFAULT_SORT, InvalidCursor, keyset_page, order_by_sort, iter_ndjson, approximate_counter
+)
+from view_counter import view_counter
+from category_counters import counted_category, apply_transition, get_counts
+from result_cache import result_cache, make_key
+from serialization import project, row_to_dict, json_response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+import json
+import os
+import threading
 import requests
 
 publications_bp = Blueprint('publications', __name__)
@@ -9,6 +20,164 @@ publications_bp = Blueprint('publications', __name__)
 # URL du service utilisateur pour vérifier les propriétaires
 USER_SERVICE_URL = "http://user_service:5000"
 
+# URL du service de réservations (disponibilité par dates)
+RESERVATION_SERVICE_URL = "http://reservation_service:5002"
+
+# Jeton partagé envoyé au service de réservations (en-tête X-Service-Token)
+SERVICE_TOKEN = os.environ.get("SERVICE_TOKEN", "")
+
+# Délai maximum d'attente du service de réservations (secondes)
+RESERVATION_SERVICE_TIMEOUT = 2
+
+# Nombre d'IDs envoyés par appel de disponibilité (limite du service de réservations)
+AVAILABILITY_BATCH_SIZE = 1000
+
+# Nombre maximum de publications candidates pour un filtre par dates
+MAX_AVAILABILITY_CANDIDATES = 5000
+
+
+def _notify_items_changed(publication_ids):
+    """
+    Prévient le service de réservations qu'il doit oublier ces publications
+    (propriétaire, prix, disponibilité), sans ralentir la réponse
+
+    En cas d'échec, le cache distant expire de lui-même (durée de vie courte).
+    """
+    def send():
+        try:
+            requests.post(
+                f"{RESERVATION_SERVICE_URL}/reservations/items/invalidate",
+                json={'ids': list(publication_ids)},
+                headers={'X-Service-Token': SERVICE_TOKEN},
+                timeout=RESERVATION_SERVICE_TIMEOUT
+            )
+        except requests.RequestException:
+            pass
+    
+    threading.Thread(target=send, daemon=True).start()
+
+
+class ReservationServiceUnavailable(Exception):
+    """
+    Le service de réservations n'a pas pu répondre
+    """
+
+
+def _unavailable_publication_ids(available_from, available_to, candidate_ids):
+    """
+    Récupère, parmi des publications candidates, celles réservées sur une période
+
+    Seuls les IDs candidats sont envoyés (par lots de AVAILABILITY_BATCH_SIZE) :
+    la liste renvoyée reste bornée par les résultats de la recherche et non
+    par le nombre total de réservations.
+
+    Args:
+        available_from (str): Date de début (YYYY-MM-DD)
+        available_to (str): Date de fin (YYYY-MM-DD)
+        candidate_ids (list): IDs des publications qui vérifient les autres filtres
+
+    Returns:
+        list: IDs des publications candidates indisponibles sur la période
+
+    Raises:
+        ValueError: Si les dates sont invalides
+        ReservationServiceUnavailable: Si le service ne répond pas
+    """
+    unavailable_ids = []
+    for start in range(0, len(candidate_ids), AVAILABILITY_BATCH_SIZE):
+        try:
+            response = requests.post(
+                f"{RESERVATION_SERVICE_URL}/reservations/availability",
+                json={
+                    'start_date': available_from,
+                    'end_date': available_to,
+                    'car_ids': candidate_ids[start:start + AVAILABILITY_BATCH_SIZE]
+                },
+                timeout=RESERVATION_SERVICE_TIMEOUT
+            )
+        except requests.RequestException as e:
+            raise ReservationServiceUnavailable(str(e)) from e
+        
+        if response.status_code == 400:
+            raise ValueError(response.json().get('error', 'Dates invalides'))
+        if response.status_code != 200:
+            raise ReservationServiceUnavailable(f'HTTP {response.status_code}')
+        unavailable_ids.extend(response.json()['unavailable_ids'])
+    return unavailable_ids
+
+
+def _active_reservation_counts(publication_ids):
+    """
+    Récupère en un seul appel le nombre de réservations actives
+    (en attente ou confirmées) de plusieurs publications
+
+    Args:
+        publication_ids (list): IDs des publications
+
+    Returns:
+        dict: ID de publication -> nombre de réservations actives
+
+    Raises:
+        ReservationServiceUnavailable: Si le service ne répond pas
+    """
+    if not publication_ids:
+        return {}
+    try:
+        response = requests.post(
+            f"{RESERVATION_SERVICE_URL}/reservations/counts",
+            json={'car_ids': list(publication_ids)},
+            timeout=RESERVATION_SERVICE_TIMEOUT
+        )
+    except requests.RequestException as e:
+        raise ReservationServiceUnavailable(str(e)) from e
+    
+    if response.status_code != 200:
+        raise ReservationServiceUnavailable(f'HTTP {response.status_code}')
+    return {int(pub_id): counts['active'] for pub_id, counts in response.json()['counts'].items()}
+
+
+def _weekly_discount_percent(data):
+    """
+    Lit la remise hebdomadaire (%) d'un corps de requête
+
+    Returns:
+        float: Remise entre 0 et 100 (exclu), 0 si absente, None si invalide
+    """
+    try:
+        value = float(data.get('weekly_discount_percent') or 0)
+    except (ValueError, TypeError):
+        return None
+    return value if 0 <= value < 100 else None
+
+
+def _matching_categories(category_filter):
+    """
+    Catégories valides contenant le filtre saisi (recherche partielle),
+    toutes les catégories sans filtre
+    """
+    categories = Publication.get_valid_categories()
+    if category_filter:
+        categories = [c for c in categories if category_filter.lower() in c]
+    return categories
+
+
+def _list_cache_tags(category_filter):
+    """
+    Tags d'une liste mise en cache : une entrée par catégorie que la liste
+    peut inclure
+    """
+    return ['category:' + c for c in _matching_categories(category_filter)]
+
+
+def _invalidate_cache(publication_id, *categories):
+    """
+    Invalide les entrées du cache touchées par l'écriture d'une publication
+    """
+    tags = ['categories'] + ['category:' + c for c in set(categories) if c]
+    if publication_id is not None:
+        tags.append(f'publication:{publication_id}')
+    result_cache.invalidate(*tags)
+
 @publications_bp.route('/publications', methods=['GET'])
 def get_all_publications():
     """
@@ -20,15 +189,43 @@ def get_all_publications():
     - max_price: prix maximum par jour
     - available_only: true pour afficher seulement les articles disponibles
     - search: recherche textuelle dans le titre et description
+    - has_images: true pour afficher seulement les annonces avec photos
+    - sort: date_desc, date_asc, price_asc, price_desc
+    
+    Pagination par curseur (défilement infini) :
+    - cursor: vide pour la première page, puis la valeur de `next_cursor`
+    - include_total: true pour inclure un total approximatif (mis en cache)
+    Sans `cursor`, la pagination classique par `page` est utilisée.
+    
+    Les réponses sont mises en cache par jeu de paramètres (voir result_cache).
     """
+    cache_key = make_key('list', request.args.items(multi=True))
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        return json_response(cached)
+    # Lue avant les requêtes : une invalidation pendant le calcul empêche la mise en cache
+    cache_generation = result_cache.generation()
+    cache_tags = _list_cache_tags(request.args.get('category'))
+    
     try:
+        sort = request.args.get('sort')
+        cursor_mode = 'cursor' in request.args
+        if cursor_mode:
+            sort = sort or DEFAULT_SORT
+            if sort not in SORTS:
+                return jsonify({
+                    'error': f'Tri invalide. Tris autorisés: {", ".join(SORTS)}'
+                }), 400
+        
         # Construction de la requête de base
         query = Publication.query.filter_by(is_active=True)
         
         # Filtres optionnels
         category = request.args.get('category')
         if category:
-            query = query.filter(Publication.category.ilike(f'%{category}%'))
+            # Recherche partielle résolue sur la liste fermée des catégories :
+            # un IN utilise les index composites, contrairement à ILIKE '%...%'
+            query = query.filter(Publication.category.in_(_matching_categories(category)))
             
         location = request.args.get('location')
         if location:
@@ -42,52 +239,85 @@ def get_all_publications():
         if max_price:
             query = query.filter(Publication.price_per_day <= max_price)
         
-        sort = request.args.get('sort')
-        if sort == 'date_desc':
-            query = query.order_by(Publication.created_at.desc())
-        elif sort == 'date_asc':
-            query = query.order_by(Publication.created_at.asc())
-        
-        elif sort == "price_asc":
-            # Prix croissant
-            query = query.order_by(Publication.price_per_day.asc())
-
-        elif sort == "price_desc":
-            # Prix décroissant
-            query = query.order_by(Publication.price_per_day.desc())
+        # En mode curseur, le tri (colonne, id) est appliqué par keyset_page
+        if not cursor_mode:
+            if sort == 'date_desc':
+                query = query.order_by(Publication.created_at.desc())
+            elif sort == 'date_asc':
+                query = query.order_by(Publication.created_at.asc())
+            
+            elif sort == "price_asc":
+                # Prix croissant
+                query = query.order_by(Publication.price_per_day.asc())
+
+            elif sort == "price_desc":
+                # Prix décroissant
+                query = query.order_by(Publication.price_per_day.desc())
             
         available_only = request.args.get('available_only', 'false').lower() == 'true'
         if available_only:
             query = query.filter(Publication.is_available == True)
+        
+        has_images = request.args.get('has_images', 'false').lower() == 'true'
+        if has_images:
+            query = query.filter(Publication.image_count > 0)
             
         search = request.args.get('search')
         if search:
-            search_term = f'%{search}%'
-            query = query.filter(
-                db.or_(
-                    Publication.title.ilike(search_term),
-                    Publication.description.ilike(search_term)
-                )
-            )
+            # Index plein texte, trié par pertinence après le tri demandé
+            query = search_publications(query, search, order_by_relevance=not cursor_mode)
         
         # Pagination
-        page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 10, type=int), 50)  # Max 50 par page
         
-        publications = query.paginate(
+        if cursor_mode:
+            rows, next_cursor = keyset_page(
+                project(query),
+                sort,
+                request.args.get('cursor') or None,
+                per_page
+            )
+            
+            response = {
+                'publications': [row_to_dict(row) for row in rows],
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None,
+                'sort': sort,
+                'per_page': per_page
+            }
+            
+            # Total optionnel, approximatif et mis en cache par jeu de filtres
+            if request.args.get('include_total', 'false').lower() == 'true':
+                filters_key = tuple(sorted(
+                    (key, value) for key, value in request.args.items(multi=True)
+                    if key not in ('cursor', 'per_page', 'page', 'sort', 'include_total')
+                ))
+                response['total'] = approximate_counter.count(filters_key, query)
+                response['total_is_approximate'] = True
+            
+            result_cache.set(cache_key, response, cache_tags, cache_generation)
+            return json_response(response)
+        
+        page = request.args.get('page', 1, type=int)
+        
+        publications = project(query).paginate(
             page=page, 
             per_page=per_page, 
             error_out=False
         )
         
-        return jsonify({
-            'publications': [pub.to_dict() for pub in publications.items],
+        response = {
+            'publications': [row_to_dict(row) for row in publications.items],
             'total': publications.total,
             'total_pages': publications.pages,
             'page': page,
             'per_page': per_page
-        }), 200
+        }
+        result_cache.set(cache_key, response, cache_tags, cache_generation)
+        return json_response(response)
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Erreur lors de la récupération des publications: {str(e)}'}), 500
 
@@ -96,23 +326,47 @@ def get_publication(publication_id):
     """
     Récupère les détails d'une publication spécifique
     """
-    publication = Publication.query.get_or_404(publication_id)
+    cache_key = make_key('detail', [('id', publication_id)])
+    publication_data = result_cache.get(cache_key)
     
-    if not publication.is_active:
-        return jsonify({'error': 'Publication non disponible'}), 404
+    if publication_data is None:
+        cache_generation = result_cache.generation()
+        publication = Publication.query.get_or_404(publication_id)
+        
+        if not publication.is_active:
+            return jsonify({'error': 'Publication non disponible'}), 404
         
-    return jsonify(publication.to_dict()), 200
+        publication_data = publication.to_dict()
+        result_cache.set(cache_key, publication_data, [f'publication:{publication_id}'], cache_generation)
+    
+    # Vue mise en tampon, écrite par lots en arrière-plan (pas de commit ici)
+    view_counter.record(publication_id)
+    
+    publication_data = dict(publication_data)
+    publication_data['view_count'] = (publication_data['view_count'] or 0) + view_counter.pending(publication_id)
+    return jsonify(publication_data), 200
 
 @publications_bp.route('/publications/user', methods=['GET'])
 @jwt_required()
 def get_user_publications():
     """
     Récupère toutes les publications d'un utilisateur connecté
+    Query param optionnel: with_reservations=true ajoute à chaque publication
+    son nombre de réservations actives (un seul appel au service de réservations)
     """
     user_id = int(get_jwt_identity())
     publications = Publication.query.filter_by(owner_id=user_id).all()
+    results = [pub.to_dict() for pub in publications]
     
-    return jsonify([pub.to_dict() for pub in publications]), 200
+    if request.args.get('with_reservations', 'false').lower() == 'true':
+        try:
+            counts = _active_reservation_counts([pub.id for pub in publications])
+        except ReservationServiceUnavailable:
+            return jsonify({'error': 'Service de réservations indisponible'}), 503
+        for result in results:
+            result['active_reservations'] = counts.get(result['id'], 0)
+    
+    return jsonify(results), 200
 
 @publications_bp.route('/publications/create', methods=['POST'])
 @jwt_required()
@@ -120,7 +374,7 @@ def create_publication():
     """
     Crée une nouvelle publication
     Champs requis: title, description, category, price_per_day, location
-    Champs optionnels: images, condition, deposit_required
+    Champs optionnels: images, condition, deposit_required, weekly_discount_percent
     """
     user_id = int(get_jwt_identity())
     data = request.get_json() or {}
@@ -146,6 +400,10 @@ def create_publication():
     except (ValueError, TypeError):
         return jsonify({'error': 'Prix par jour invalide'}), 400
     
+    weekly_discount_percent = _weekly_discount_percent(data)
+    if weekly_discount_percent is None:
+        return jsonify({'error': 'La remise hebdomadaire doit être comprise entre 0 et 100'}), 400
+    
     try:
         new_publication = Publication(
             title=data['title'].strip(),
@@ -157,12 +415,17 @@ def create_publication():
             images=data.get('images', []),  # Liste d'URLs d'images
             condition=data.get('condition', 'bon'),  # neuf, excellent, bon, acceptable
             deposit_required=data.get('deposit_required', 0),
+            weekly_discount_percent=weekly_discount_percent,
             is_available=True,
             is_active=True
         )
         
         db.session.add(new_publication)
+        db.session.flush()
+        index_publication(new_publication)
+        apply_transition(None, counted_category(new_publication))
         db.session.commit()
+        _invalidate_cache(None, new_publication.category)
         
         return jsonify(new_publication.to_dict()), 201
         
@@ -185,6 +448,8 @@ def update_publication(publication_id):
         return jsonify({'error': 'Vous n\'êtes pas autorisé à modifier cette publication'}), 403
     
     data = request.get_json() or {}
+    counted_before = counted_category(publication)
+    category_before = publication.category
     
     try:
         # Mise à jour des champs modifiables
@@ -213,11 +478,21 @@ def update_publication(publication_id):
                 publication.condition = data['condition'].lower()
         if 'deposit_required' in data:
             publication.deposit_required = float(data['deposit_required'])
+        if 'weekly_discount_percent' in data:
+            weekly_discount_percent = _weekly_discount_percent(data)
+            if weekly_discount_percent is None:
+                return jsonify({'error': 'La remise hebdomadaire doit être comprise entre 0 et 100'}), 400
+            publication.weekly_discount_percent = weekly_discount_percent
         if 'is_available' in data:
             publication.is_available = bool(data['is_available'])
             
         publication.updated_at = datetime.utcnow()
+        if 'title' in data or 'description' in data:
+            index_publication(publication)
+        apply_transition(counted_before, counted_category(publication))
         db.session.commit()
+        _invalidate_cache(publication.id, category_before, publication.category)
+        _notify_items_changed([publication.id])
         
         return jsonify(publication.to_dict()), 200
         
@@ -240,9 +515,13 @@ def toggle_availability(publication_id):
         return jsonify({'error': 'Vous n\'êtes pas autorisé à modifier cette publication'}), 403
     
     try:
+        counted_before = counted_category(publication)
         publication.is_available = not publication.is_available
         publication.updated_at = datetime.utcnow()
+        apply_transition(counted_before, counted_category(publication))
         db.session.commit()
+        _invalidate_cache(publication.id, publication.category)
+        _notify_items_changed([publication.id])
         
         status = "disponible" if publication.is_available else "indisponible"
         return jsonify({
@@ -268,26 +547,25 @@ def delete_publication(publication_id):
     
     # Vérifier s'il y a des réservations en cours
     try:
-        # Appel au service de réservations pour vérifier
-        import requests
-        response = requests.get(f"http://reservation_service:5002/reservations/publication/{publication_id}")
-        if response.status_code == 200:
-            reservations = response.json()
-            active_reservations = [r for r in reservations if r['status'] in ['pending', 'confirmed']]
-            if active_reservations:
-                return jsonify({
-                    'error': 'Impossible de supprimer une publication avec des réservations actives'
-                }), 400
-    except:
+        if _active_reservation_counts([publication_id]).get(publication_id):
+            return jsonify({
+                'error': 'Impossible de supprimer une publication avec des réservations actives'
+            }), 400
+    except ReservationServiceUnavailable:
         # Si le service de réservation n'est pas disponible, on continue
         pass
     
     try:
         # Soft delete - on marque comme inactive au lieu de supprimer
+        counted_before = counted_category(publication)
         publication.is_active = False
         publication.is_available = False
         publication.updated_at = datetime.utcnow()
+        index_publication(publication)
+        apply_transition(counted_before, None)
         db.session.commit()
+        _invalidate_cache(publication.id, publication.category)
+        _notify_items_changed([publication.id])
         
         return jsonify({'message': 'Publication supprimée avec succès'}), 200
         
@@ -299,29 +577,16 @@ def delete_publication(publication_id):
 def get_categories():
     """
     Retourne la liste des catégories disponibles avec le nombre de publications par catégorie
+    Les compteurs sont maintenus à chaque écriture (voir category_counters) :
+    aucun parcours de la table publications
     """
     try:
-        categories_stats = db.session.query(
-            Publication.category,
-            db.func.count(Publication.id).label('count')
-        ).filter(
-            Publication.is_active == True,
-            Publication.is_available == True
-        ).group_by(Publication.category).all()
-        
-        categories = {
-            'bricolage': 0,
-            'sport': 0, 
-            'jardinage': 0,
-            'electromenager': 0,
-            'transport': 0,
-            'autre': 0
-        }
-        
-        for category, count in categories_stats:
-            if category in categories:
-                categories[category] = count
-        
+        cache_key = make_key('categories', [])
+        categories = result_cache.get(cache_key)
+        if categories is None:
+            cache_generation = result_cache.generation()
+            categories = get_counts()
+            result_cache.set(cache_key, categories, ['categories'], cache_generation)
         return jsonify(categories), 200
         
     except Exception as e:
@@ -338,24 +603,40 @@ def advanced_search():
         "min_price": 10,
         "max_price": 50,
         "condition": ["bon", "excellent"],
+        "has_images": true,
         "available_from": "2024-01-15",
         "available_to": "2024-01-20"
     }
+    
+    Pagination (même contrat que GET /publications) :
+    - page, per_page: pagination classique (par défaut)
+    - cursor: vide pour la première page, puis la valeur de `next_cursor`
+    - sort: date_desc, date_asc, price_asc, price_desc
+    - include_total: true pour inclure un total approximatif en mode curseur
+    
+    Streaming : "stream": true (ou Accept: application/x-ndjson) renvoie
+    tous les résultats en NDJSON, une publication par ligne, lus par lots.
     """
     data = request.get_json() or {}
     
+    sort = data.get('sort')
+    cursor_mode = 'cursor' in data
+    stream_mode = bool(data.get('stream')) or \
+        request.accept_mimetypes.best == 'application/x-ndjson'
+    if cursor_mode or stream_mode:
+        sort = sort or DEFAULT_SORT
+    if sort is not None and sort not in SORTS:
+        return jsonify({
+            'error': f'Tri invalide. Tris autorisés: {", ".join(SORTS)}'
+        }), 400
+    
     try:
         query = Publication.query.filter_by(is_active=True, is_available=True)
         
         # Recherche par mots-clés
         if 'keywords' in data and data['keywords']:
-            keywords = f"%{data['keywords']}%"
-            query = query.filter(
-                db.or_(
-                    Publication.title.ilike(keywords),
-                    Publication.description.ilike(keywords)
-                )
-            )
+            # Sans tri explicite, les résultats sont triés par pertinence
+            query = search_publications(query, data['keywords'], order_by_relevance=sort is None)
         
         # Autres filtres comme dans get_all_publications
         if 'category' in data and data['category']:
@@ -373,15 +654,87 @@ def advanced_search():
         if 'condition' in data and isinstance(data['condition'], list):
             query = query.filter(Publication.condition.in_(data['condition']))
         
-        # TODO: Ajouter la vérification de disponibilité par dates si nécessaire
-        # Cela nécessiterait d'intégrer avec le service de réservations
+        if data.get('has_images'):
+            query = query.filter(Publication.image_count > 0)
         
-        publications = query.all()
+        # Disponibilité par dates : les publications qui vérifient les autres
+        # filtres sont envoyées au service de réservations, qui renvoie celles
+        # réservées sur la période, exclues en bloc
+        if data.get('available_from') or data.get('available_to'):
+            if not (data.get('available_from') and data.get('available_to')):
+                return jsonify({'error': 'available_from et available_to doivent être fournis ensemble'}), 400
+            candidate_ids = [
+                publication_id for publication_id, in
+                query.with_entities(Publication.id).order_by(None).limit(MAX_AVAILABILITY_CANDIDATES + 1)
+            ]
+            if len(candidate_ids) > MAX_AVAILABILITY_CANDIDATES:
+                return jsonify({
+                    'error': 'Trop de résultats pour filtrer par dates, précisez la recherche '
+                             '(mots-clés, catégorie, lieu, prix)'
+                }), 400
+            try:
+                unavailable_ids = _unavailable_publication_ids(
+                    data['available_from'], data['available_to'], candidate_ids
+                )
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            except ReservationServiceUnavailable:
+                return jsonify({'error': 'Service de réservations indisponible, réessayez plus tard'}), 503
+            if unavailable_ids:
+                query = query.filter(Publication.id.notin_(unavailable_ids))
         
-        return jsonify({
-            'publications': [pub.to_dict() for pub in publications],
-            'total': len(publications)
-        }), 200
+        if stream_mode:
+            return Response(
+                stream_with_context(iter_ndjson(order_by_sort(query, sort))),
+                mimetype='application/x-ndjson'
+            )
+        
+        per_page = min(int(data.get('per_page', 10)), 50)  # Max 50 par page
         
+        if cursor_mode:
+            rows, next_cursor = keyset_page(project(query), sort, data['cursor'] or None, per_page)
+            
+            response = {
+                'publications': [row_to_dict(row) for row in rows],
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None,
+                'sort': sort,
+                'per_page': per_page
+            }
+            
+            # Total optionnel, approximatif et mis en cache par jeu de filtres
+            if data.get('include_total'):
+                filters_key = ('advanced', json.dumps({
+                    key: value for key, value in data.items()
+                    if key not in ('cursor', 'per_page', 'page', 'sort', 'include_total', 'stream')
+                }, sort_keys=True, default=str))
+                response['total'] = approximate_counter.count(filters_key, query)
+                response['total_is_approximate'] = True
+            
+            return json_response(response)
+        
+        if sort is not None:
+            query = order_by_sort(query, sort)
+        
+        page = int(data.get('page', 1))
+        
+        publications = project(query).paginate(
+            page=page,
+            per_page=per_page,
+            error_out=False
+        )
+        
+        return json_response({
+            'publications': [row_to_dict(row) for row in publications.items],
+            'total': publications.total,
+            'total_pages': publications.pages,
+            'page': page,
+            'per_page': per_page
+        })
+        
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Paramètres de pagination invalides'}), 400
     except Exception as e:
         return jsonify({'error': f'Erreur lors de la recherche: {str(e)}'}), 500
\ No newline at end of file
@@ -0,0 +1,311 @@
+"""
+Index de recherche plein texte des publications
+
+Remplace les filtres `ILIKE '%mot%'` sur le titre et la description, qui
+obligent MySQL à parcourir toute la table, par un index inversé maintenu à
+chaque création, modification ou suppression (soft delete) d'une publication.
+
+Deux backends sont disponibles :
+- FullTextBackend : index FULLTEXT MySQL sur un document normalisé
+- TermIndexBackend : table de termes (terme -> publication) portable,
+  utilisée sur SQLite et pour les tests
+
+Le texte est découpé en mots, mis en minuscules et débarrassé de ses accents
+("Perceuse électrique" -> ["perceuse", "electrique"]) afin qu'une recherche
+"electrique" trouve "électrique".
+"""
+import re
+import unicodedata
+
+from flask import current_app
+from sqlalchemy.dialects.mysql import match
+
+from models import db, Publication, PublicationSearchDocument, PublicationSearchTerm
+
+# Poids d'un mot du titre par rapport à un mot de la description
+TITLE_WEIGHT = 3
+DESCRIPTION_WEIGHT = 1
+
+# Longueur minimale d'un mot indexé
+MIN_TOKEN_LENGTH = 2
+
+# Longueur minimale d'un mot pour InnoDB (innodb_ft_min_token_size)
+FULLTEXT_MIN_TOKEN_LENGTH = 3
+
+# Mots vides français ignorés à l'indexation et à la recherche (sans accents)
+STOP_WORDS = frozenset([
+    'au', 'aux', 'avec', 'ce', 'ces', 'dans', 'de', 'des', 'du', 'elle', 'en',
+    'et', 'eux', 'il', 'je', 'la', 'le', 'les', 'leur', 'lui', 'ma', 'mais',
+    'me', 'meme', 'mes', 'moi', 'mon', 'ne', 'nos', 'notre', 'nous', 'on',
+    'ou', 'par', 'pas', 'pour', 'qu', 'que', 'qui', 'sa', 'se', 'ses', 'son',
+    'sur', 'ta', 'te', 'tes', 'toi', 'ton', 'tu', 'un', 'une', 'vos', 'votre',
+    'vous', 'est', 'sont', 'tres', 'plus', 'peu'
+])
+
+# Ligatures non décomposées par la normalisation Unicode
+LIGATURES = {'œ': 'oe', 'æ': 'ae', 'ß': 'ss'}
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def fold_accents(text):
+    """
+    Met le texte en minuscules et supprime les accents
+
+    Args:
+        text (str): Texte à normaliser
+
+    Returns:
+        str: Texte sans accents ni majuscules
+    """
+    text = text.lower()
+    for ligature, replacement in LIGATURES.items():
+        text = text.replace(ligature, replacement)
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def normalize_token(token):
+    """
+    Racinisation légère : retire le "s" final du pluriel
+    ("perceuses" et "perceuse" donnent le même terme)
+    """
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """
+    Découpe un texte en termes indexables
+
+    Args:
+        text (str): Texte libre (titre, description ou requête)
+
+    Returns:
+        list: Termes normalisés, dans l'ordre d'apparition
+    """
+    if not text:
+        return []
+
+    tokens = []
+    for token in TOKEN_PATTERN.findall(fold_accents(text)):
+        if len(token) < MIN_TOKEN_LENGTH or token in STOP_WORDS:
+            continue
+        tokens.append(normalize_token(token))
+    return tokens
+
+
+def weighted_terms(publication):
+    """
+    Calcule le poids de chaque terme d'une publication
+
+    Returns:
+        dict: terme -> poids (somme des occurrences pondérées)
+    """
+    weights = {}
+    for token in tokenize(publication.title):
+        weights[token] = weights.get(token, 0) + TITLE_WEIGHT
+    for token in tokenize(publication.description):
+        weights[token] = weights.get(token, 0) + DESCRIPTION_WEIGHT
+    return weights
+
+
+def query_terms(keywords):
+    """
+    Termes distincts d'une requête de recherche, dans l'ordre de saisie
+    """
+    return list(dict.fromkeys(tokenize(keywords)))
+
+
+def substring_filter(query, keywords):
+    """
+    Recherche par sous-chaîne (sans index), utilisée seulement quand la
+    requête ne contient aucun mot indexable (mots vides, mots trop courts)
+    """
+    search_term = f'%{keywords}%'
+    return query.filter(
+        db.or_(
+            Publication.title.ilike(search_term),
+            Publication.description.ilike(search_term)
+        )
+    )
+
+
+class TermIndexBackend:
+    """
+    Index inversé stocké dans la table publication_search_terms
+
+    Chaque terme est une entrée (terme, publication, poids) ; la recherche
+    ne lit que les lignes des termes demandés grâce à la clé primaire.
+    Le dernier mot de la requête est recherché en préfixe pour permettre
+    la saisie incrémentale ("perc" trouve "perceuse").
+    """
+    name = 'terms'
+
+    def index(self, publication):
+        self.remove(publication.id)
+        rows = [
+            {'term': term[:64], 'publication_id': publication.id, 'weight': weight}
+            for term, weight in weighted_terms(publication).items()
+        ]
+        if rows:
+            db.session.execute(db.insert(PublicationSearchTerm), rows)
+
+    def remove(self, publication_id):
+        PublicationSearchTerm.query.filter_by(publication_id=publication_id).delete(synchronize_session=False)
+
+    def apply(self, query, keywords):
+        terms = query_terms(keywords)
+        if not terms:
+            return substring_filter(query, keywords), None
+
+        last = len(terms) - 1
+        matches = []
+        for position, term in enumerate(terms):
+            if position == last:
+                condition = PublicationSearchTerm.term.like(f'{term}%')
+            else:
+                condition = PublicationSearchTerm.term == term
+            matches.append(
+                db.select(
+                    PublicationSearchTerm.publication_id,
+                    PublicationSearchTerm.weight,
+                    db.literal(position).label('position')
+                ).where(condition)
+            )
+
+        hits = db.union_all(*matches).subquery()
+        scores = db.select(
+            hits.c.publication_id,
+            db.func.sum(hits.c.weight).label('score')
+        ).group_by(
+            hits.c.publication_id
+        ).having(
+            # Tous les mots de la requête doivent être présents
+            db.func.count(db.distinct(hits.c.position)) == len(terms)
+        ).subquery()
+
+        query = query.join(scores, scores.c.publication_id == Publication.id)
+        return query, scores.c.score
+
+
+class FullTextBackend:
+    """
+    Index FULLTEXT MySQL sur la table publication_search_documents
+
+    Le document contient les termes normalisés du titre (répétés selon
+    TITLE_WEIGHT) et de la description ; MATCH ... AGAINST en mode booléen
+    fournit le filtrage et le score de pertinence.
+    """
+    name = 'fulltext'
+
+    def index(self, publication):
+        content = []
+        for term, weight in weighted_terms(publication).items():
+            content.extend([term] * weight)
+        db.session.merge(PublicationSearchDocument(
+            publication_id=publication.id,
+            content=' '.join(content)
+        ))
+
+    def remove(self, publication_id):
+        PublicationSearchDocument.query.filter_by(publication_id=publication_id).delete(synchronize_session=False)
+
+    def apply(self, query, keywords):
+        terms = [term for term in query_terms(keywords) if len(term) >= FULLTEXT_MIN_TOKEN_LENGTH]
+        if not terms:
+            # Mots trop courts pour InnoDB
+            return substring_filter(query, keywords), None
+
+        against = ' '.join(f'+{term}*' for term in terms)
+        score = match(PublicationSearchDocument.content, against=against).in_boolean_mode()
+
+        query = query.join(
+            PublicationSearchDocument,
+            PublicationSearchDocument.publication_id == Publication.id
+        ).filter(score > 0)
+        return query, score
+
+
+BACKENDS = {
+    TermIndexBackend.name: TermIndexBackend,
+    FullTextBackend.name: FullTextBackend
+}
+
+
+def get_backend():
+    """
+    Retourne le backend configuré (SEARCH_BACKEND) ou, par défaut,
+    FULLTEXT sur MySQL et l'index de termes sur les autres bases
+    """
+    name = current_app.config.get('SEARCH_BACKEND')
+    if not name:
+        name = FullTextBackend.name if db.engine.dialect.name == 'mysql' else TermIndexBackend.name
+    return BACKENDS[name]()
+
+
+def index_publication(publication):
+    """
+    Met à jour l'index pour une publication (à appeler avant le commit)
+
+    Les publications supprimées (is_active=False) sont retirées de l'index.
+    """
+    backend = get_backend()
+    if publication.is_active:
+        backend.index(publication)
+    else:
+        backend.remove(publication.id)
+
+
+def search_publications(query, keywords, order_by_relevance=True):
+    """
+    Restreint une requête Publication aux résultats d'une recherche
+
+    Args:
+        query (Query): Requête SQLAlchemy sur Publication
+        keywords (str): Mots-clés saisis par l'utilisateur
+        order_by_relevance (bool): Trier par pertinence décroissante
+
+    Returns:
+        Query: Requête filtrée (et triée par pertinence)
+    """
+    query, score = get_backend().apply(query, keywords)
+    if score is None:
+        # Recherche par sous-chaîne : pas de score de pertinence
+        return query
+    if order_by_relevance:
+        query = query.order_by(score.desc())
+    return query
+
+
+def rebuild_index(batch_size=500):
+    """
+    Reconstruit entièrement l'index (migration des publications existantes)
+
+    Returns:
+        int: Nombre de publications indexées
+    """
+    backend = get_backend()
+    PublicationSearchTerm.query.delete(synchronize_session=False)
+    PublicationSearchDocument.query.delete(synchronize_session=False)
+
+    indexed = 0
+    last_id = 0
+    while True:
+        batch = Publication.query.filter(
+            Publication.is_active == True,
+            Publication.id > last_id
+        ).order_by(Publication.id).limit(batch_size).all()
+        if not batch:
+            break
+
+        for publication in batch:
+            backend.index(publication)
+        db.session.flush()
+
+        indexed += len(batch)
+        last_id = batch[-1].id
+
+    db.session.commit()
+    return indexed
@@ -0,0 +1,135 @@
+"""
+Sérialisation rapide des listes de publications
+
+Publication.to_dict() charge des instances ORM complètes puis convertit
+chaque champ en Python (float(Decimal), isoformat(), ...) avant que jsonify
+n'encode le tout avec l'encodeur de la bibliothèque standard.
+
+Pour les listes, on sélectionne uniquement les colonnes renvoyées par l'API
+(tuples, sans instances ORM ni suivi de session) et on encode directement
+les Decimal et datetime :
+- avec orjson si le paquet est installé (datetime natif, Decimal via `default`)
+- sinon avec json de la bibliothèque standard et la même fonction `default`
+
+Une fois décodé, le JSON produit donne les mêmes valeurs que to_dict() +
+jsonify (mêmes clés, Decimal en nombres, dates ISO 8601). Le texte n'est pas
+identique octet pour octet : les clés suivent l'ordre des colonnes au lieu
+d'être triées, et les caractères non ASCII sont écrits en UTF-8 au lieu
+d'être échappés (ensure_ascii=False).
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import Response
+
+from models import Publication
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    orjson = None
+
+# Colonnes renvoyées par l'API publique (voir Publication.to_dict)
+PUBLIC_COLUMNS = (
+    Publication.id,
+    Publication.title,
+    Publication.description,
+    Publication.category,
+    Publication.price_per_day,
+    Publication.location,
+    Publication.condition,
+    Publication.is_available,
+    Publication.images,
+    Publication.created_at,
+    Publication.updated_at,
+    Publication.view_count,
+    Publication.deposit_required,
+    Publication.weekly_discount_percent,
+)
+
+
+def project(query):
+    """
+    Restreint une requête Publication aux colonnes publiques
+
+    Les filtres et le tri de la requête sont conservés ; les résultats sont
+    des tuples nommés (row.id, row.created_at, ...) et non des instances.
+
+    Args:
+        query (Query): Requête filtrée sur Publication
+
+    Returns:
+        Query: Requête renvoyant des tuples
+    """
+    return query.with_entities(*PUBLIC_COLUMNS)
+
+
+def row_to_dict(row):
+    """
+    Équivalent de Publication.to_dict() pour un tuple issu de project()
+
+    Les Decimal et datetime sont laissés tels quels : dumps() les encode.
+
+    Args:
+        row (Row): Ligne renvoyée par une requête projetée
+
+    Returns:
+        dict: Représentation publique de la publication
+    """
+    data = {
+        'id': row.id,
+        'title': row.title,
+        'description': row.description,
+        'category': row.category,
+        'price_per_day': row.price_per_day,
+        'location': row.location,
+        'condition': row.condition,
+        'is_available': row.is_available,
+        'images': row.images or [],
+        'created_at': row.created_at,
+        'updated_at': row.updated_at,
+        'view_count': row.view_count
+    }
+    if row.deposit_required and row.deposit_required > 0:
+        data['deposit_required'] = row.deposit_required
+    if row.weekly_discount_percent and row.weekly_discount_percent > 0:
+        data['weekly_discount_percent'] = row.weekly_discount_percent
+    return data
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Type non sérialisable en JSON: {type(value).__name__}')
+
+
+def dumps(payload):
+    """
+    Encode une valeur en JSON (bytes), Decimal et datetime compris
+
+    Args:
+        payload: Valeur à encoder
+
+    Returns:
+        bytes: Document JSON encodé en UTF-8
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(payload, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(payload, status=200):
+    """
+    Remplace jsonify pour les réponses volumineuses
+
+    Args:
+        payload: Valeur à encoder
+        status (int): Code HTTP
+
+    Returns:
+        Response: Réponse application/json
+    """
+    return Response(dumps(payload), status=status, mimetype='application/json')
@@ -0,0 +1,58 @@
+"""
+Fixtures des tests du service publications
+
+Les tests tournent sur une base SQLite temporaire (moteur de recherche de
+repli 'terms'), ou sur la base de TEST_DATABASE_URL pour vérifier les plans
+MySQL : cette base est vidée, elle doit être dédiée aux tests.
+
+Lancement : `python -m pytest tests` depuis Backend/publications
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ['DATABASE_URL'] = os.environ.get('TEST_DATABASE_URL') or \
+    'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'publications_test.db')
+os.environ.setdefault('CATEGORY_COUNTERS_RECONCILE_INTERVAL', '0')
+os.environ.setdefault('CACHE_TTL', '0')
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app  # noqa: E402
+from models import db  # noqa: E402
+
+# Publications créées pour les tests (catégories, prix et lieux variés)
+SAMPLE_PUBLICATIONS = [
+    {
+        'title': f'Perceuse {position}' if position % 3 else f'Vélo électrique {position}',
+        'description': 'Perceuse à percussion Bosch' if position % 3 else 'Vélo de randonnée',
+        'category': 'bricolage' if position % 2 else 'sport',
+        'price_per_day': 5 + position,
+        'location': 'Paris' if position % 4 else 'Lyon',
+    }
+    for position in range(30)
+]
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    client = app.test_client()
+    with app.app_context():
+        headers = {'Authorization': 'Bearer ' + create_access_token(identity='1')}
+    for publication in SAMPLE_PUBLICATIONS:
+        response = client.post('/publications/create', json=publication, headers=headers)
+        assert response.status_code == 201, response.get_json()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
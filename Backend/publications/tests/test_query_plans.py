@@ -0,0 +1,25 @@
+"""
+Aucune combinaison filtre/tri supportée ne doit parcourir toute la table
+publications (voir query_plans)
+"""
+import pytest
+
+from query_plans import requests_to_check, check_request
+
+CHECKS = requests_to_check()
+
+
+@pytest.mark.parametrize(
+    'method, path, payload',
+    [check[1:] for check in CHECKS],
+    ids=[check[0] for check in CHECKS]
+)
+def test_no_full_scan(app, client, method, path, payload):
+    failures = check_request(app, client, method, path, payload)
+    assert not failures, '\n'.join(f"{statement}\n  {'; '.join(scans)}" for statement, scans in failures)
+
+
+def test_search_and_location_combinations_are_checked():
+    names = [check[0] for check in CHECKS]
+    assert any('search=' in name and 'location=' in name for name in names)
+    assert any("'keywords'" in name and "'location'" in name for name in names)
@@ -0,0 +1,149 @@
+"""
+Normalisation du texte et index de termes (repli portable de la recherche)
+"""
+import pytest
+
+from models import db, Publication
+from search_index import fold_accents, tokenize, query_terms, TermIndexBackend
+
+# Publications propres à ces tests (mots absents des données communes)
+SEARCH_PUBLICATIONS = [
+    ('Tronçonneuse thermique', 'Tronçonneuse Stihl pour élagage'),
+    ('Scie sauteuse', 'Lames pour tronçonner le bois'),
+    ('Taille-haie électrique', 'Idéal pour les haies du jardin'),
+    ('Ponceuse orbitale', 'Ponceuse avec aspiration, tronçonneuse non fournie'),
+    ('Nettoyeur haute pression', 'Kärcher avec œillets de fixation'),
+]
+
+
+def test_fold_accents_lowercases_and_strips_accents():
+    assert fold_accents('Électrique Tronçonneuse À Pâques') == 'electrique tronconneuse a paques'
+
+
+def test_fold_accents_expands_ligatures():
+    assert fold_accents('Œillet cœur Straße') == 'oeillet coeur strasse'
+
+
+def test_tokenize_drops_stop_words_short_words_and_punctuation():
+    assert tokenize("Perceuse de l'atelier, très puissante !") == ['perceuse', 'atelier', 'puissante']
+
+
+def test_tokenize_reduces_plurals():
+    assert tokenize('Perceuses électriques') == tokenize('perceuse électrique') == ['perceuse', 'electrique']
+
+
+def test_tokenize_keeps_double_s_and_short_words():
+    assert tokenize('Express bus') == ['express', 'bus']
+
+
+def test_tokenize_empty_text():
+    assert tokenize(None) == []
+    assert tokenize('') == []
+
+
+def test_query_terms_are_distinct_in_typing_order():
+    assert query_terms('Scie scies sauteuse') == ['scie', 'sauteuse']
+
+
+@pytest.fixture(scope='module')
+def indexed(app):
+    """
+    Publications indexées avec TermIndexBackend, quel que soit le backend configuré
+
+    Returns:
+        dict: Titre -> ID
+    """
+    backend = TermIndexBackend()
+    with app.app_context():
+        publications = [
+            Publication(
+                title=title, description=description, category='jardinage',
+                price_per_day=10, location='Nantes', owner_id=1
+            )
+            for title, description in SEARCH_PUBLICATIONS
+        ]
+        db.session.add_all(publications)
+        db.session.flush()
+        for publication in publications:
+            backend.index(publication)
+        db.session.commit()
+        ids = {publication.title: publication.id for publication in publications}
+
+    yield ids
+
+    with app.app_context():
+        for publication_id in ids.values():
+            backend.remove(publication_id)
+        Publication.query.filter(Publication.id.in_(ids.values())).delete(synchronize_session=False)
+        db.session.commit()
+
+
+def search(app, keywords):
+    """
+    Titres trouvés par TermIndexBackend.apply, triés par pertinence quand
+    l'index fournit un score
+    """
+    with app.app_context():
+        query, score = TermIndexBackend().apply(Publication.query.filter(Publication.category == 'jardinage'), keywords)
+        if score is not None:
+            query = query.order_by(score.desc(), Publication.id)
+        return [publication.title for publication in query]
+
+
+def test_search_ignores_accents_and_case(app, indexed):
+    assert search(app, 'TRONCONNEUSE')[0] == 'Tronçonneuse thermique'
+    assert 'Taille-haie électrique' in search(app, 'electrique')
+
+
+def test_search_matches_plural_and_singular(app, indexed):
+    assert search(app, 'ponceuses') == ['Ponceuse orbitale']
+
+
+def test_last_word_is_a_prefix(app, indexed):
+    assert set(search(app, 'tronc')) == {'Tronçonneuse thermique', 'Scie sauteuse', 'Ponceuse orbitale'}
+
+
+def test_only_last_word_is_a_prefix(app, indexed):
+    assert search(app, 'scie tronc') == ['Scie sauteuse']
+    assert search(app, 'tronc scie') == []
+
+
+def test_all_words_are_required(app, indexed):
+    assert search(app, 'ponceuse tronconneuse') == ['Ponceuse orbitale']
+    assert search(app, 'scie thermique') == []
+
+
+def test_title_matches_rank_before_description_matches(app, indexed):
+    assert search(app, 'tronconneuse') == ['Tronçonneuse thermique', 'Ponceuse orbitale']
+
+
+def test_ligatures_are_searchable(app, indexed):
+    assert search(app, 'oeillets') == ['Nettoyeur haute pression']
+
+
+def test_stop_words_only_fall_back_to_substring(app, indexed):
+    # Aucun terme indexable : recherche par sous-chaîne, sans score
+    with app.app_context():
+        _, score = TermIndexBackend().apply(Publication.query, 'de')
+    assert score is None
+    assert 'Nettoyeur haute pression' in search(app, 'de')
+
+
+def test_removed_publication_is_not_found(app, indexed):
+    backend = TermIndexBackend()
+    with app.app_context():
+        backend.remove(indexed['Scie sauteuse'])
+        db.session.commit()
+    try:
+        assert search(app, 'sauteuse') == []
+    finally:
+        with app.app_context():
+            backend.index(db.session.get(Publication, indexed['Scie sauteuse']))
+            db.session.commit()
+
+
+def test_list_endpoint_searches_through_the_index(client):
+    response = client.get('/publications', query_string={'search': 'perceuses bosch', 'per_page': 50})
+    titles = [publication['title'] for publication in response.get_json()['publications']]
+    assert response.status_code == 200
+    assert titles and all(title.startswith('Perceuse') for title in titles)
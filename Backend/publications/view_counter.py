@@ -0,0 +1,137 @@
+"""
+Compteur de vues des publications en écriture différée (write-behind)
+
+Chaque consultation d'une publication ne fait plus `view_count += 1` suivi
+d'un commit (lecture-modification-écriture qui perd des incréments en cas
+d'accès concurrents). Les vues sont accumulées en mémoire puis appliquées par
+lots, de façon atomique côté base :
+
+    UPDATE publications SET view_count = view_count + :n WHERE id IN (...)
+
+Le tampon est vidé par un thread d'arrière-plan à intervalle régulier, plus
+tôt si le nombre de publications en attente dépasse un seuil, et à l'arrêt
+du processus. Les vues non encore écrites sont perdues en cas d'arrêt brutal.
+"""
+import atexit
+import threading
+from collections import defaultdict
+
+from models import db, Publication
+from result_cache import result_cache
+
+# Intervalle entre deux écritures du tampon (secondes)
+DEFAULT_FLUSH_INTERVAL = 10
+
+# Nombre de publications distinctes en attente déclenchant une écriture anticipée
+DEFAULT_FLUSH_THRESHOLD = 500
+
+
+class ViewCounter:
+    """
+    Tampon des vues par publication, vidé par lots
+    """
+
+    def __init__(self, flush_interval=DEFAULT_FLUSH_INTERVAL, flush_threshold=DEFAULT_FLUSH_THRESHOLD):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._pending = defaultdict(int)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._app = None
+
+    def init_app(self, app):
+        """
+        Démarre le thread d'écriture pour une application
+
+        Args:
+            app (Flask): Application dont le contexte est utilisé pour écrire
+        """
+        self.flush_interval = app.config.get('VIEW_COUNT_FLUSH_INTERVAL', self.flush_interval)
+        self.flush_threshold = app.config.get('VIEW_COUNT_FLUSH_THRESHOLD', self.flush_threshold)
+        self._app = app
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='view-counter-flush', daemon=True)
+            self._thread.start()
+            atexit.register(self._flush_in_app_context)
+
+    def record(self, publication_id, count=1):
+        """
+        Enregistre des vues sans accès à la base
+
+        Args:
+            publication_id (int): ID de la publication consultée
+            count (int): Nombre de vues à ajouter
+        """
+        with self._lock:
+            self._pending[publication_id] += count
+            should_flush = len(self._pending) >= self.flush_threshold
+
+        if should_flush:
+            # L'écriture reste faite par le thread d'arrière-plan
+            self._wakeup.set()
+
+    def pending(self, publication_id):
+        """
+        Retourne le nombre de vues en attente d'écriture pour une publication
+        """
+        with self._lock:
+            return self._pending.get(publication_id, 0)
+
+    def flush(self):
+        """
+        Écrit les vues en attente (à appeler dans un contexte d'application)
+
+        Les publications sont regroupées par incrément pour limiter le nombre
+        de requêtes UPDATE. En cas d'erreur, les vues sont remises en attente.
+
+        Returns:
+            int: Nombre de vues écrites
+        """
+        with self._lock:
+            batch, self._pending = self._pending, defaultdict(int)
+        if not batch:
+            return 0
+
+        by_increment = defaultdict(list)
+        for publication_id, count in batch.items():
+            by_increment[count].append(publication_id)
+
+        try:
+            for count, publication_ids in by_increment.items():
+                db.session.execute(
+                    db.update(Publication)
+                    .where(Publication.id.in_(publication_ids))
+                    .values(view_count=db.func.coalesce(Publication.view_count, 0) + count)
+                    .execution_options(synchronize_session=False)
+                )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            with self._lock:
+                for publication_id, count in batch.items():
+                    self._pending[publication_id] += count
+            raise
+
+        # Les détails en cache portent l'ancien view_count
+        result_cache.invalidate(*[f'publication:{publication_id}' for publication_id in batch])
+        return sum(batch.values())
+
+    def _flush_in_app_context(self):
+        if self._app is None:
+            return
+        with self._app.app_context():
+            try:
+                self.flush()
+            except Exception as e:
+                self._app.logger.warning(f"Écriture des compteurs de vues échouée: {e}")
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._flush_in_app_context()
+
+
+view_counter = ViewCounter()
@@ -1,5 +1,7 @@
 from flask import Flask, jsonify
 from models import db, Reservation
+from migrations import upgrade as upgrade_schema
+from lifecycle import lifecycle_worker
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity
 from flask_cors import CORS
@@ -8,7 +10,7 @@ import pymysql
 pymysql.install_as_MySQLdb()
 
 import sys
-from pathlib import Pathcle_secrete
+from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 migrate = Migrate()
@@ -22,11 +24,25 @@ mysql_database = os.environ.get("MYSQL_DATABASE", "projet5_reservation")
 
 def create_app():
     app = Flask(__name__)
-    app.config["SQLALCHEMY_DATABASE_URI"] = (f"mysql+pymysql://{mysql_user}:{mysql_password}@{mysql_host}:3306/{mysql_database}")
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
+        "DATABASE_URL",
+        f"mysql+pymysql://{mysql_user}:{mysql_password}@{mysql_host}:3306/{mysql_database}"
+    )
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     CORS(app)  # Permettre CORS pour toutes les routes par défaut
 
     app.config["JWT_SECRET_KEY"] = "cle_secrete"
+
+    # Cycle de vie automatique des réservations (secondes, 0 pour désactiver le job)
+    app.config["RESERVATION_LIFECYCLE_INTERVAL"] = float(os.environ.get("RESERVATION_LIFECYCLE_INTERVAL", 900))
+
+    # Utilisateurs autorisés à exporter toutes les réservations (IDs séparés par des virgules)
+    app.config["ADMIN_USER_IDS"] = {
+        int(user_id) for user_id in os.environ.get("ADMIN_USER_IDS", "").split(",") if user_id.strip()
+    }
+
+    # Jeton partagé exigé sur les routes appelées par les autres services (vide : routes refusées)
+    app.config["SERVICE_TOKEN"] = os.environ.get("SERVICE_TOKEN", "")
     jwt.init_app(app)
 
     db.init_app(app)
@@ -34,10 +50,27 @@ def create_app():
 
     with app.app_context():
         db.create_all()
+        upgrade_schema()
+
+    # Migrations de schéma des tables existantes : flask --app app migrate-schema
+    @app.cli.command("migrate-schema")
+    def migrate_schema():
+        for name, result in upgrade_schema().items():
+            print(f"{name} : {result}")
+
+    # Passage manuel du job de cycle de vie : flask --app app run-lifecycle-jobs
+    @app.cli.command("run-lifecycle-jobs")
+    def run_lifecycle_jobs():
+        from lifecycle import run_lifecycle
+        for name, count in run_lifecycle().items():
+            print(f"{name} : {count}")
 
     from routes import reservation_bp as reservation_bp_blueprint
     app.register_blueprint(reservation_bp_blueprint)
 
+    # Terminaison et expiration des réservations en arrière-plan
+    lifecycle_worker.init_app(app)
+
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,178 @@
+"""
+Calendrier d'occupation des articles
+
+Pour afficher un mois, le frontend appelait /reservations/check-availability
+jour par jour (un appel HTTP et une requête SQL chacun). Le calendrier d'un
+article est ici une liste triée d'intervalles [début, fin] (dates en ordinal)
+des réservations bloquantes, chargée une fois depuis la base puis tenue à
+jour à chaque création, confirmation, annulation ou fin de réservation.
+
+Une période se lit alors par recherche dichotomique dans la liste, sans accès
+à la base. Le cache est propre à chaque processus : une durée de vie courte
+borne le décalage avec les écritures faites par un autre processus.
+"""
+import bisect
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+
+from models import Reservation, BLOCKING_STATUSES
+
+# Durée de vie d'un calendrier en cache (secondes) et nombre d'articles gardés
+CALENDAR_TTL = float(os.environ.get("CALENDAR_TTL", 30))
+CALENDAR_MAX_ITEMS = int(os.environ.get("CALENDAR_MAX_ITEMS", 5000))
+
+# Période maximale demandée en un appel (jours)
+MAX_RANGE_DAYS = 366
+
+
+def _ordinal(value):
+    # Les colonnes DateTime comme les dates Python donnent un numéro de jour
+    return (value.date() if isinstance(value, datetime) else value).toordinal()
+
+
+class ItemCalendar:
+    """
+    Intervalles occupés d'un article, triés par date de début
+
+    Chaque entrée est (début, fin, id de réservation), bornes incluses.
+    """
+
+    def __init__(self, reservations):
+        self.intervals = sorted(
+            (_ordinal(r.start_date), _ordinal(r.end_date), r.id)
+            for r in reservations
+        )
+        # Plus longue réservation : borne la recherche des intervalles commencés avant la période
+        self.max_length = max((end - start for start, end, _ in self.intervals), default=0)
+
+    def add(self, start, end, reservation_id):
+        self.remove(reservation_id)
+        bisect.insort(self.intervals, (start, end, reservation_id))
+        self.max_length = max(self.max_length, end - start)
+
+    def remove(self, reservation_id):
+        self.intervals = [interval for interval in self.intervals if interval[2] != reservation_id]
+
+    def overlapping(self, start, end):
+        """
+        Intervalles qui chevauchent [start, end] (ordinaux)
+        """
+        first = bisect.bisect_left(self.intervals, (start - self.max_length,))
+        last = bisect.bisect_right(self.intervals, (end, float('inf')))
+        return [
+            (interval_start, interval_end)
+            for interval_start, interval_end, _ in self.intervals[first:last]
+            if interval_end >= start
+        ]
+
+
+class CalendarCache:
+    """
+    Calendriers par article, en LRU avec expiration
+
+    Le chargement depuis la base se fait hors du verrou. Chaque modification
+    incrémente un numéro de génération : un calendrier chargé pendant qu'une
+    modification a eu lieu est renvoyé mais pas mis en cache (il pourrait ne
+    pas la contenir).
+    """
+
+    def __init__(self, ttl=CALENDAR_TTL, max_items=CALENDAR_MAX_ITEMS):
+        self.ttl = ttl
+        self.max_items = max_items
+        self._calendars = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get(self, car_id):
+        """
+        Retourne le calendrier d'un article, chargé depuis la base si besoin
+
+        Args:
+            car_id (int): ID de l'article
+
+        Returns:
+            ItemCalendar: Intervalles occupés de l'article
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._calendars.get(car_id)
+            if entry is not None and entry[1] > now:
+                self._calendars.move_to_end(car_id)
+                return entry[0]
+            generation = self._generation
+
+        reservations = Reservation.query.with_entities(
+            Reservation.id, Reservation.start_date, Reservation.end_date
+        ).filter(
+            Reservation.car_id == car_id,
+            Reservation.status.in_(BLOCKING_STATUSES)
+        ).all()
+        calendar = ItemCalendar(reservations)
+
+        with self._lock:
+            if self._generation != generation:
+                return calendar
+            self._calendars.pop(car_id, None)
+            while len(self._calendars) >= self.max_items:
+                self._calendars.popitem(last=False)
+            self._calendars[car_id] = (calendar, now + self.ttl)
+        return calendar
+
+    def reservation_changed(self, reservation):
+        """
+        Répercute la création ou le changement de statut d'une réservation
+        sur le calendrier en cache de son article (après le commit)
+
+        Args:
+            reservation (Reservation): Réservation créée ou modifiée
+        """
+        with self._lock:
+            self._generation += 1
+            entry = self._calendars.get(reservation.car_id)
+            if entry is None:
+                return
+            calendar = entry[0]
+            if reservation.status in BLOCKING_STATUSES:
+                calendar.add(_ordinal(reservation.start_date), _ordinal(reservation.end_date), reservation.id)
+            else:
+                calendar.remove(reservation.id)
+
+    def invalidate(self, car_ids):
+        """
+        Oublie les calendriers d'articles modifiés hors de l'API
+        (mises à jour par lots), rechargés au prochain accès
+        """
+        with self._lock:
+            self._generation += 1
+            for car_id in car_ids:
+                self._calendars.pop(car_id, None)
+
+
+def occupancy(calendar, start, end):
+    """
+    Occupation d'un article sur une période
+
+    Args:
+        calendar (ItemCalendar): Calendrier de l'article
+        start (date): Premier jour
+        end (date): Dernier jour (inclus)
+
+    Returns:
+        tuple: (intervalles occupés [(date, date)], bitmap '0'/'1' par jour)
+    """
+    start_ordinal, end_ordinal = start.toordinal(), end.toordinal()
+    booked = calendar.overlapping(start_ordinal, end_ordinal)
+
+    days = bytearray(b'0' * (end_ordinal - start_ordinal + 1))
+    for interval_start, interval_end in booked:
+        for day in range(max(interval_start, start_ordinal), min(interval_end, end_ordinal) + 1):
+            days[day - start_ordinal] = ord('1')
+
+    intervals = [(date.fromordinal(s), date.fromordinal(e)) for s, e in booked]
+    return intervals, days.decode('ascii')
+
+
+calendar_cache = CalendarCache()
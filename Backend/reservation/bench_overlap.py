@@ -0,0 +1,135 @@
+"""
+Benchmark de la vérification de chevauchement des réservations
+
+Remplit la table reservation (1 000 000 de lignes par défaut) puis compare la
+latence moyenne de la vérification de disponibilité :
+- avant : schéma d'origine, sans aucun index secondaire sur reservation,
+  filtre puis `.all()` et `len(...) == 0`
+- après : tous les index de Reservation recréés, sonde EXISTS sur
+  ix_reservation_car_status_dates
+
+Usage :
+    python bench_overlap.py [--rows 1000000] [--cars 20000] [--probes 500]
+    python bench_overlap.py --database-url mysql+pymysql://... --empty-table
+
+Par défaut la base est une base SQLite temporaire (DATABASE_URL est ignorée).
+--database-url vise une base de test MySQL : la table reservation y est
+vidée puis remplie, le script refuse donc de s'y connecter sans --empty-table.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BATCH_SIZE = 50000
+STATUSES = ['pending', 'confirmed', 'cancelled', 'completed']
+
+
+def _fill(rows, cars):
+    from models import db, Reservation
+
+    db.session.execute(db.delete(Reservation))
+    db.session.commit()
+
+    rng = random.Random(42)
+    origin = datetime(2023, 1, 1)
+    for start in range(0, rows, BATCH_SIZE):
+        batch = []
+        for _ in range(min(BATCH_SIZE, rows - start)):
+            begin = origin + timedelta(days=rng.randrange(730))
+            batch.append({
+                'car_id': rng.randrange(1, cars + 1),
+                'user_id': rng.randrange(1, 5000),
+                'start_date': begin,
+                'end_date': begin + timedelta(days=rng.randrange(1, 8)),
+                'total_price': 10.0,
+                'status': rng.choice(STATUSES)
+            })
+        db.session.execute(db.insert(Reservation), batch)
+        db.session.commit()
+
+
+def _old_check(car_id, start, end):
+    from models import db, Reservation
+
+    overlapping_reservations = Reservation.query.filter(
+        Reservation.car_id == car_id,
+        Reservation.status.in_(['pending', 'confirmed']),
+        db.or_(
+            db.and_(
+                Reservation.start_date <= end,
+                Reservation.end_date >= start
+            )
+        )
+    ).all()
+    return len(overlapping_reservations) == 0
+
+
+def _new_check(car_id, start, end):
+    from routes import has_overlapping_reservation
+
+    return not has_overlapping_reservation(car_id, start, end)
+
+
+def _measure(check, probes):
+    from models import db
+
+    start_time = time.perf_counter()
+    for car_id, start, end in probes:
+        check(car_id, start, end)
+        db.session.expunge_all()
+    return (time.perf_counter() - start_time) / len(probes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--cars', type=int, default=20000)
+    parser.add_argument('--probes', type=int, default=500)
+    parser.add_argument('--database-url', help='Base de test à utiliser (SQLite temporaire par défaut)')
+    parser.add_argument('--empty-table', action='store_true',
+                        help='Confirme que la table reservation de --database-url peut être vidée')
+    args = parser.parse_args()
+
+    if args.database_url and not args.empty_table:
+        parser.error('--database-url vide la table reservation : ajoutez --empty-table sur une base de test')
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    # Pas de job de cycle de vie pendant la mesure
+    os.environ['RESERVATION_LIFECYCLE_INTERVAL'] = '0'
+
+    from sqlalchemy import inspect
+
+    from app import create_app
+    from models import db, Reservation
+
+    app = create_app()
+    with app.app_context():
+        # Référence : la table sans index secondaire, comme avant l'introduction des index
+        existing = {ix['name'] for ix in inspect(db.engine).get_indexes(Reservation.__tablename__)}
+        indexes = [ix for ix in Reservation.__table__.indexes if ix.name in existing]
+        for index in indexes:
+            index.drop(db.engine)
+
+        print(f"Remplissage de {args.rows} réservations...")
+        _fill(args.rows, args.cars)
+
+        rng = random.Random(7)
+        probes = []
+        for _ in range(args.probes):
+            start = datetime(2023, 1, 1) + timedelta(days=rng.randrange(730))
+            probes.append((rng.randrange(1, args.cars + 1), start.date(), (start + timedelta(days=3)).date()))
+
+        before = _measure(_old_check, probes)
+        for index in indexes:
+            index.create(db.engine)
+        after = _measure(_new_check, probes)
+
+        print(f"{'vérification':<36}{'latence moyenne':>18}")
+        print(f"{'sans index secondaire, .all()':<36}{before * 1000:>15.3f} ms")
+        print(f"{'index composite, EXISTS':<36}{after * 1000:>15.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+Création de réservation sans course ni doublon
+
+Vérifier le chevauchement puis insérer, sans verrou entre les deux, laisse
+deux réservations concurrentes sur les mêmes dates réussir toutes les deux.
+Ici, l'insertion se fait sous un verrou par article : la ligne de l'article
+dans reservation_item_lock est verrouillée (`SELECT ... FOR UPDATE`) jusqu'au
+commit. Les réservations d'articles différents ne s'attendent pas entre elles.
+
+La ligne de verrou d'un article est créée (si besoin) dans sa propre courte
+transaction avant la prise du verrou : sous InnoDB, un `SELECT ... FOR UPDATE`
+sur une ligne absente pose un verrou d'intervalle, et deux premières
+réservations concurrentes d'un même article s'interbloqueraient en insérant
+la ligne. Un interblocage ou un délai d'attente de verrou restant est
+signalé par is_lock_conflict() et la création est retentée.
+
+Un client peut envoyer un en-tête `Idempotency-Key` : le résultat de la
+première création est enregistré dans la même transaction que la
+réservation et rejoué tel quel pour les nouvelles tentatives.
+"""
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from models import db, ItemLock, IdempotencyKey
+
+# Durée pendant laquelle une Idempotency-Key est rejouée (heures)
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.environ.get("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+
+# Clé acceptée : 1 à 255 caractères (taille de la colonne) parmi lettres, chiffres et - _ . :
+IDEMPOTENCY_KEY_PATTERN = re.compile(r"[A-Za-z0-9_.:-]{1,255}")
+
+
+# Codes d'erreur MySQL : délai d'attente de verrou dépassé, interblocage
+LOCK_CONFLICT_ERROR_CODES = (1205, 1213)
+
+
+class IdempotencyKeyMismatch(Exception):
+    """La même Idempotency-Key a déjà servi pour une requête différente"""
+
+
+def is_valid_idempotency_key(key):
+    """
+    Indique si une Idempotency-Key peut être enregistrée telle quelle
+    """
+    return IDEMPOTENCY_KEY_PATTERN.fullmatch(key) is not None
+
+
+def request_fingerprint(data):
+    """
+    Empreinte d'un corps de requête, indépendante de l'ordre des champs
+
+    Returns:
+        str: SHA-256 hexadécimal
+    """
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def ensure_lock_row(car_id):
+    """
+    Crée la ligne de verrou d'un article si elle n'existe pas, dans une
+    transaction séparée validée aussitôt (insertion sans erreur si la ligne
+    existe déjà)
+
+    Args:
+        car_id (int): ID de l'article
+    """
+    dialect = db.engine.dialect.name
+    if dialect == 'mysql':
+        statement = mysql.insert(ItemLock).values(car_id=car_id).on_duplicate_key_update(car_id=car_id)
+    elif dialect == 'postgresql':
+        statement = postgresql.insert(ItemLock).values(car_id=car_id).on_conflict_do_nothing()
+    else:
+        statement = sqlite.insert(ItemLock).values(car_id=car_id).on_conflict_do_nothing()
+    with db.engine.begin() as connection:
+        connection.execute(statement)
+
+
+def lock_item(car_id):
+    """
+    Verrouille un article jusqu'à la fin de la transaction courante
+
+    La ligne de l'article, créée au préalable par ensure_lock_row(), est lue
+    avec FOR UPDATE : les autres transactions qui réservent cet article
+    attendent le commit ou le rollback.
+
+    À appeler en début de transaction : sous MySQL (REPEATABLE READ), une
+    lecture faite avant le verrou figerait une image de la base antérieure
+    aux réservations validées par le détenteur précédent du verrou.
+
+    Args:
+        car_id (int): ID de l'article
+    """
+    ensure_lock_row(car_id)
+    db.session.query(ItemLock).filter(ItemLock.car_id == car_id).with_for_update().one()
+
+
+def is_lock_conflict(error):
+    """
+    Indique si une OperationalError est un interblocage ou un délai
+    d'attente de verrou (la transaction peut être retentée)
+    """
+    args = getattr(getattr(error, 'orig', None), 'args', ())
+    if args and args[0] in LOCK_CONFLICT_ERROR_CODES:
+        return True
+    return 'database is locked' in str(error)
+
+
+def find_stored_response(user_id, key, fingerprint):
+    """
+    Cherche le résultat enregistré pour une Idempotency-Key
+
+    Args:
+        user_id (int): Utilisateur connecté
+        key (str): Valeur de l'en-tête Idempotency-Key
+        fingerprint (str): Empreinte du corps de la requête
+
+    Returns:
+        tuple: (corps JSON, code HTTP), ou None si la clé est inconnue ou expirée
+
+    Raises:
+        IdempotencyKeyMismatch: Si la clé a servi pour un autre corps
+    """
+    stored = db.session.get(IdempotencyKey, (user_id, key))
+    if stored is None:
+        return None
+    if stored.created_at < datetime.utcnow() - timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS):
+        db.session.delete(stored)
+        db.session.flush()
+        return None
+    if stored.request_hash != fingerprint:
+        raise IdempotencyKeyMismatch()
+    return json.loads(stored.response_body), stored.status_code
+
+
+def store_response(user_id, key, fingerprint, body, status_code):
+    """
+    Enregistre le résultat d'une création dans la transaction courante
+    """
+    db.session.add(IdempotencyKey(
+        user_id=user_id,
+        key=key,
+        request_hash=fingerprint,
+        status_code=status_code,
+        response_body=json.dumps(body)
+    ))
+
+
+def purge_expired_keys():
+    """
+    Supprime les Idempotency-Key expirées
+
+    Returns:
+        int: Nombre de clés supprimées
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS)
+    deleted = IdempotencyKey.query.filter(IdempotencyKey.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
@@ -0,0 +1,142 @@
+"""
+Appels concurrents aux autres microservices, avec délai global
+
+Un handler qui interroge plusieurs services les appelait l'un après l'autre :
+sa latence était la somme de celles de ses dépendances. Les appels
+indépendants sont ici soumis ensemble à un pool de threads partagé par le
+processus ; le handler poursuit son propre travail (requêtes SQL) pendant ce
+temps, puis attend les résultats jusqu'à un délai global compté depuis la
+soumission. La requête coûte alors la plus lente des dépendances.
+
+Les appels exécutés dans le pool n'ont pas de contexte Flask (ni `g`, ni
+session SQLAlchemy) : ils ne doivent faire que du réseau, par exemple
+service_client.fetch_car.
+
+    pending = fan_out({'car': lambda: fetch_car(car_id),
+                       'user': lambda: fetch_user(user_id)},
+                      optional=('user',))
+    ...  # travail local
+    results = pending.wait()
+
+Un groupe de nombreux appels (devis groupé) passe `max_concurrency` : il
+n'occupe alors que ce nombre de threads du pool, qui enchaînent ses appels,
+et laisse les autres threads aux requêtes concurrentes.
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_EXCEPTION
+
+from service_client import ServiceUnavailable
+
+# Nombre de threads du pool (appels simultanés pour tout le processus)
+FANOUT_MAX_WORKERS = int(os.environ.get("FANOUT_MAX_WORKERS", 16))
+
+# Délai global d'un groupe d'appels (secondes)
+FANOUT_DEADLINE = float(os.environ.get("FANOUT_DEADLINE", 4.0))
+
+_executor = ThreadPoolExecutor(max_workers=FANOUT_MAX_WORKERS, thread_name_prefix="fanout")
+
+
+class DeadlineExceeded(ServiceUnavailable):
+    """
+    Au moins un appel obligatoire n'a pas répondu avant le délai global
+    """
+
+
+class PendingCalls:
+    """
+    Groupe d'appels en cours, soumis par fan_out()
+    """
+
+    def __init__(self, futures, optional, deadline):
+        self._futures = futures
+        self._optional = set(optional)
+        self._deadline = deadline
+
+    def wait(self):
+        """
+        Attend les résultats jusqu'au délai global
+
+        Returns:
+            dict: Nom -> résultat ; None pour un appel facultatif en échec
+            ou hors délai
+
+        Raises:
+            DeadlineExceeded: Si un appel obligatoire n'a pas répondu à temps
+            Exception: L'exception levée par un appel obligatoire
+        """
+        required = [future for name, future in self._futures.items() if name not in self._optional]
+        # Une erreur d'un appel obligatoire interrompt l'attente sans attendre les autres
+        wait(required, timeout=max(self._deadline - time.monotonic(), 0), return_when=FIRST_EXCEPTION)
+        wait(self._futures.values(), timeout=max(self._deadline - time.monotonic(), 0))
+
+        # Les appels pas encore commencés sont annulés avant de lever une erreur,
+        # pour ne pas occuper le pool après l'abandon du groupe
+        for future in self._futures.values():
+            future.cancel()
+
+        results = {}
+        for name, future in self._futures.items():
+            optional = name in self._optional
+            if future.cancelled() or not future.done():
+                if not optional:
+                    raise DeadlineExceeded(f"Délai dépassé pour l'appel '{name}'")
+                results[name] = None
+            elif future.exception() is not None:
+                if not optional:
+                    raise future.exception()
+                results[name] = None
+            else:
+                results[name] = future.result()
+        return results
+
+    def succeeded(self, name):
+        """
+        Indique si un appel a répondu à temps, sans erreur (pour distinguer
+        un résultat None d'un appel facultatif en échec)
+        """
+        future = self._futures[name]
+        return future.done() and not future.cancelled() and future.exception() is None
+
+
+def _run_queue(queue):
+    # Exécute les appels d'un groupe l'un après l'autre ; les appels annulés
+    # par PendingCalls.wait() (délai dépassé) sont sautés
+    while True:
+        try:
+            future, call = queue.popleft()
+        except IndexError:
+            return
+        if not future.set_running_or_notify_cancel():
+            continue
+        try:
+            future.set_result(call())
+        except Exception as e:
+            future.set_exception(e)
+
+
+def fan_out(calls, optional=(), deadline=FANOUT_DEADLINE, max_concurrency=None):
+    """
+    Lance des appels indépendants en parallèle
+
+    Args:
+        calls (dict): Nom -> fonction sans argument
+        optional (tuple): Noms des appels dont l'échec ne fait pas échouer le groupe
+        deadline (float): Délai global en secondes, compté à partir de maintenant
+        max_concurrency (int): Nombre maximum de threads du pool occupés par
+            le groupe (par défaut un par appel)
+
+    Returns:
+        PendingCalls: Groupe d'appels dont on attend les résultats avec wait()
+    """
+    expires_at = time.monotonic() + deadline
+    if max_concurrency is None or len(calls) <= max_concurrency:
+        futures = {name: _executor.submit(call) for name, call in calls.items()}
+        return PendingCalls(futures, optional, expires_at)
+
+    futures = {name: Future() for name in calls}
+    queue = deque((futures[name], call) for name, call in calls.items())
+    for _ in range(max_concurrency):
+        _executor.submit(_run_queue, queue)
+    return PendingCalls(futures, optional, expires_at)
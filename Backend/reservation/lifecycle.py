@@ -0,0 +1,154 @@
+"""
+Cycle de vie automatique des réservations
+
+Une réservation ne passait à `completed` que si le propriétaire appelait
+/reservations/<id>/complete, et une réservation `pending` n'expirait jamais :
+la vérification de chevauchement continuait de buter sur ces lignes. Ce job
+fait passer :
+- les réservations confirmées dont la date de fin est passée à `completed`
+- les réservations en attente dont la date de début est passée à `expired`
+  (statut non bloquant) ; une demande encore à venir reste en attente tant
+  que le propriétaire ne l'a pas traitée, sauf si PENDING_TTL_HOURS est
+  défini : elle expire alors aussi au-delà de cet âge
+
+Les mises à jour sont ensemblistes et par lots : les IDs d'un lot sont lus
+puis modifiés en un seul `UPDATE ... WHERE id IN (...)`, validé avant le lot
+suivant, pour garder les transactions et les verrous courts. Le statut est
+revérifié dans l'UPDATE : une réservation modifiée entre-temps par l'API (ou
+par le job d'un autre processus) n'est pas écrasée.
+
+Lancement manuel : `flask --app app run-lifecycle-jobs`.
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+
+from models import db, Reservation
+from availability_calendar import calendar_cache
+from booking import purge_expired_keys
+
+# Intervalle entre deux passages du job (secondes, 0 pour désactiver)
+DEFAULT_LIFECYCLE_INTERVAL = 900
+
+# Nombre de réservations modifiées par UPDATE
+LIFECYCLE_BATCH_SIZE = int(os.environ.get("LIFECYCLE_BATCH_SIZE", 1000))
+
+# Âge au-delà duquel une réservation en attente expire même si elle n'a pas
+# commencé (heures, 0 pour désactiver : seules les réservations commencées expirent)
+PENDING_TTL_HOURS = int(os.environ.get("PENDING_TTL_HOURS", 0))
+
+
+def _update_in_batches(condition, from_status, to_status, batch_size):
+    """
+    Passe par lots les réservations `from_status` qui vérifient `condition`
+    au statut `to_status`
+
+    Returns:
+        int: Nombre de réservations modifiées
+    """
+    processed = 0
+    while True:
+        rows = db.session.query(Reservation.id, Reservation.car_id).filter(
+            Reservation.status == from_status,
+            condition
+        ).order_by(Reservation.id).limit(batch_size).all()
+        if not rows:
+            return processed
+
+        updated = db.session.query(Reservation).filter(
+            Reservation.id.in_([reservation_id for reservation_id, _ in rows]),
+            Reservation.status == from_status
+        ).update(
+            {Reservation.status: to_status, Reservation.updated_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.session.commit()
+        calendar_cache.invalidate({car_id for _, car_id in rows})
+        processed += updated
+
+        if len(rows) < batch_size:
+            return processed
+
+
+def complete_finished(now=None, batch_size=LIFECYCLE_BATCH_SIZE):
+    """
+    Termine les réservations confirmées dont la date de fin est passée
+
+    Returns:
+        int: Nombre de réservations terminées
+    """
+    today = (now or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+    return _update_in_batches(Reservation.end_date < today, 'confirmed', 'completed', batch_size)
+
+
+def expire_stale_pending(now=None, batch_size=LIFECYCLE_BATCH_SIZE):
+    """
+    Fait expirer les réservations en attente déjà commencées, et celles plus
+    anciennes que PENDING_TTL_HOURS si ce délai est défini
+
+    Returns:
+        int: Nombre de réservations expirées
+    """
+    now = now or datetime.utcnow()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    condition = Reservation.start_date < today
+    if PENDING_TTL_HOURS:
+        condition = db.or_(condition, Reservation.created_at < now - timedelta(hours=PENDING_TTL_HOURS))
+    return _update_in_batches(condition, 'pending', 'expired', batch_size)
+
+
+def run_lifecycle(now=None, batch_size=LIFECYCLE_BATCH_SIZE):
+    """
+    Exécute toutes les étapes du job
+
+    Returns:
+        dict: Étape -> nombre de lignes traitées
+    """
+    return {
+        'completed': complete_finished(now, batch_size),
+        'expired': expire_stale_pending(now, batch_size),
+        'idempotency_keys_purged': purge_expired_keys(),
+    }
+
+
+class LifecycleWorker:
+    """
+    Job d'arrière-plan qui exécute run_lifecycle() à intervalle régulier
+    """
+
+    def __init__(self, interval=DEFAULT_LIFECYCLE_INTERVAL):
+        self.interval = interval
+        self._thread = None
+        self._stop = threading.Event()
+        self._app = None
+
+    def init_app(self, app):
+        """
+        Démarre le job périodique (premier passage après un intervalle)
+
+        Args:
+            app (Flask): Application dont le contexte est utilisé
+        """
+        self.interval = app.config.get('RESERVATION_LIFECYCLE_INTERVAL', self.interval)
+        self._app = app
+
+        if self._thread is None and self.interval:
+            self._thread = threading.Thread(target=self._run, name='reservation-lifecycle', daemon=True)
+            self._thread.start()
+
+    def run_once(self):
+        with self._app.app_context():
+            try:
+                processed = run_lifecycle()
+                if any(processed.values()):
+                    self._app.logger.info(f"Cycle de vie des réservations: {processed}")
+            except Exception as e:
+                db.session.rollback()
+                self._app.logger.warning(f"Job de cycle de vie des réservations échoué: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+
+lifecycle_worker = LifecycleWorker()
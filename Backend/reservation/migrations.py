@@ -0,0 +1,76 @@
+"""
+Migrations de schéma du service réservations
+
+`db.create_all()` crée les tables manquantes mais n'ajoute jamais d'index à
+une table existante. Les évolutions des bases déjà déployées sont appliquées
+ici, de façon idempotente (chaque étape inspecte la base avant d'agir).
+upgrade() est appelé au démarrage et disponible via
+`flask --app app migrate-schema`.
+"""
+from sqlalchemy import inspect, text
+
+from models import db, Reservation
+
+
+def _indexes(table_name):
+    return {index['name'] for index in inspect(db.engine).get_indexes(table_name)}
+
+
+def create_missing_indexes():
+    """
+    Crée les index déclarés sur Reservation absents de la base
+
+    Returns:
+        list: Noms des index créés
+    """
+    existing = _indexes(Reservation.__tablename__)
+    created = []
+    for index in Reservation.__table__.indexes:
+        if index.name not in existing:
+            index.create(db.engine)
+            created.append(index.name)
+    return created
+
+
+def convert_total_price_to_numeric():
+    """
+    Passe la colonne total_price de FLOAT à NUMERIC(10, 2) (montants exacts)
+
+    SQLite n'a pas de types stricts : la colonne y est laissée telle quelle.
+
+    Returns:
+        bool: True si la colonne a été convertie
+    """
+    column = next(
+        column for column in inspect(db.engine).get_columns(Reservation.__tablename__)
+        if column['name'] == 'total_price'
+    )
+    if 'NUMERIC' in str(column['type']).upper() or 'DECIMAL' in str(column['type']).upper():
+        return False
+
+    dialect = db.engine.dialect.name
+    if dialect == 'mysql':
+        statement = 'ALTER TABLE reservation MODIFY total_price NUMERIC(10, 2) NOT NULL'
+    elif dialect == 'postgresql':
+        statement = 'ALTER TABLE reservation ALTER COLUMN total_price TYPE NUMERIC(10, 2)'
+    else:
+        return False
+    with db.engine.begin() as connection:
+        connection.execute(text(statement))
+    return True
+
+
+MIGRATIONS = [
+    create_missing_indexes,
+    convert_total_price_to_numeric,
+]
+
+
+def upgrade():
+    """
+    Applique toutes les migrations dans l'ordre
+
+    Returns:
+        dict: Nom de la migration -> résultat
+    """
+    return {migration.__name__: migration() for migration in MIGRATIONS}
@@ -3,16 +3,29 @@ from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 
+# Statuts qui bloquent un article sur leurs dates
+BLOCKING_STATUSES = ['pending', 'confirmed']
+
 class Reservation(db.Model):
     __tablename__ = "reservation"
+    # Index de la vérification de chevauchement (article, statut, période),
+    # des listes paginées (par utilisateur, puis globale) triées par date de
+    # création et du job de cycle de vie (statut, date de fin) ; les bases
+    # existantes les reçoivent via migrations.upgrade()
+    __table_args__ = (
+        db.Index("ix_reservation_car_status_dates", "car_id", "status", "start_date", "end_date"),
+        db.Index("ix_reservation_user_created", "user_id", "created_at"),
+        db.Index("ix_reservation_created", "created_at"),
+        db.Index("ix_reservation_status_end", "status", "end_date"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     car_id = db.Column(db.Integer, nullable=False)
     user_id = db.Column(db.Integer, nullable=False)
     start_date = db.Column(db.DateTime, nullable=False)
     end_date = db.Column(db.DateTime, nullable=False)
-    total_price = db.Column(db.Float, nullable=False)
-    status = db.Column(db.String(20), default="pending", nullable=False)  # pending, confirmed, canceled
+    total_price = db.Column(db.Numeric(10, 2), nullable=False)  # Montant exact (voir quote.py)
+    status = db.Column(db.String(20), default="pending", nullable=False)  # pending, confirmed, cancelled, completed, expired
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
@@ -26,8 +39,26 @@ class Reservation(db.Model):
             "user_id": self.user_id,
             "start_date": self.start_date.isoformat() if self.start_date else None,
             "end_date": self.end_date.isoformat() if self.end_date else None,
-            "total_price": self.total_price,
+            "total_price": float(self.total_price) if self.total_price is not None else None,
             "status": self.status,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+        }
+
+class ItemLock(db.Model):
+    """Ligne verrouillée (SELECT ... FOR UPDATE) pour sérialiser les réservations d'un même article"""
+    __tablename__ = "reservation_item_lock"
+
+    car_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+
+class IdempotencyKey(db.Model):
+    """Résultat d'une création de réservation, rejoué si le client renvoie la même Idempotency-Key"""
+    __tablename__ = "reservation_idempotency_key"
+
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    key = db.Column(db.String(255), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer, nullable=False)
+    response_body = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=False, index=True)
@@ -0,0 +1,113 @@
+"""
+Pagination par curseur (keyset) et export NDJSON des listes de réservations
+
+Les listes sont triées par (created_at, id) décroissants ; une page est lue
+à partir de la dernière ligne de la page précédente :
+
+    WHERE (created_at, id) < (:dernier_created_at, :dernier_id)
+    ORDER BY created_at DESC, id DESC
+    LIMIT :per_page + 1
+
+Le curseur renvoyé au client est opaque (JSON encodé en base64 URL-safe).
+L'export NDJSON parcourt tous les résultats par lots via un curseur côté
+serveur, sans construire de liste en mémoire.
+"""
+import base64
+import json
+from datetime import datetime
+
+from models import db, Reservation
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+# Nombre de lignes lues par lot en mode export
+STREAM_BATCH_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    """Curseur illisible"""
+
+
+def encode_cursor(created_at, last_id):
+    payload = json.dumps([created_at.isoformat(), last_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, last_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(last_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Curseur invalide") from e
+
+
+def apply_filters(query, args):
+    """
+    Applique les filtres communs des listes de réservations
+
+    Query params:
+    - status: un ou plusieurs statuts séparés par des virgules
+    - from, to: réservations qui chevauchent la période (YYYY-MM-DD)
+    - car_id: réservations d'un article
+
+    Raises:
+        ValueError: Si une date est invalide
+    """
+    status = args.get("status")
+    if status:
+        query = query.filter(Reservation.status.in_([s.strip() for s in status.split(",") if s.strip()]))
+
+    from_date = args.get("from")
+    if from_date:
+        query = query.filter(Reservation.end_date >= datetime.strptime(from_date, "%Y-%m-%d"))
+
+    to_date = args.get("to")
+    if to_date:
+        query = query.filter(Reservation.start_date <= datetime.strptime(to_date, "%Y-%m-%d"))
+
+    car_id = args.get("car_id", type=int)
+    if car_id:
+        query = query.filter(Reservation.car_id == car_id)
+
+    return query
+
+
+def _ordered(query):
+    return query.order_by(Reservation.created_at.desc(), Reservation.id.desc())
+
+
+def keyset_page(query, cursor, per_page):
+    """
+    Lit une page de réservations après le curseur donné
+
+    Returns:
+        tuple: (liste de réservations, curseur suivant ou None)
+    """
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.filter(
+            db.tuple_(Reservation.created_at, Reservation.id) < db.tuple_(created_at, last_id)
+        )
+
+    # Une ligne de plus pour savoir s'il existe une page suivante
+    rows = _ordered(query).limit(per_page + 1).all()
+    items = rows[:per_page]
+
+    next_cursor = None
+    if len(rows) > per_page:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return items, next_cursor
+
+
+def iter_ndjson(query, batch_size=STREAM_BATCH_SIZE):
+    """
+    Parcourt toutes les réservations d'une requête et produit du NDJSON
+
+    Yields:
+        str: Une réservation sérialisée en JSON, terminée par un saut de ligne
+    """
+    rows = _ordered(query).execution_options(stream_results=True).yield_per(batch_size)
+    for reservation in rows:
+        yield json.dumps(reservation.to_dict(), separators=(",", ":")) + "\n"
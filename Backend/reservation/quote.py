@@ -0,0 +1,138 @@
+"""
+Calcul des devis de location
+
+Le prix était calculé en float (prix par jour float multiplié par le nombre
+de jours) après avoir relu les dates en texte à chaque appel. Ici tout le
+calcul se fait en Decimal, arrondi au centime, à partir de dates déjà lues,
+et un seul appel chiffre plusieurs (article, début, fin).
+
+Règles de prix d'un article (lues dans les données renvoyées par le service
+des articles) :
+- price_per_day : prix par jour, obligatoire et strictement positif (un
+  article sans prix n'est pas chiffré à 0)
+- weekly_discount_percent : remise appliquée aux jours des semaines complètes
+  (7 jours consécutifs), entre 0 et 100, 0 par défaut
+- deposit_required : caution, positive ou nulle, 0 par défaut, renvoyée à
+  part (non incluse dans le total)
+
+Une valeur illisible ou hors de ces bornes lève InvalidPrice plutôt que de
+produire un total faux (remise de plus de 100 %, majoration).
+"""
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+CENT = Decimal("0.01")
+HUNDRED = Decimal(100)
+
+
+class InvalidPrice(ValueError):
+    """
+    Règle de prix de l'article absente (prix par jour), illisible ou hors bornes
+    """
+
+
+def parse_day(value):
+    """
+    Lit une date au format YYYY-MM-DD
+
+    Raises:
+        ValueError: Si la date est absente ou invalide
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError) as e:
+        # Le message de strptime ("unconverted data remains...") n'est pas renvoyé au client
+        raise ValueError("Format de date invalide. Utilisez YYYY-MM-DD") from e
+
+
+def _decimal(item, name, error):
+    # None si le champ est absent ; InvalidPrice(error) s'il n'est pas un nombre fini
+    value = item.get(name)
+    if value is None:
+        return None
+    try:
+        # Les montants arrivent en float JSON : str() évite les artefacts binaires (0.1 -> 0.1000000000000000055)
+        number = None if isinstance(value, bool) else Decimal(str(value))
+    except InvalidOperation:
+        number = None
+    if number is None or not number.is_finite():
+        raise InvalidPrice(error)
+    return number
+
+
+def _price_per_day(item):
+    error = "Prix par jour de l'article absent ou invalide"
+    price = _decimal(item, "price_per_day", error)
+    if price is None or price <= 0:
+        raise InvalidPrice(error)
+    return price
+
+
+def _weekly_discount_percent(item):
+    error = "Remise hebdomadaire de l'article invalide (entre 0 et 100 %)"
+    percent = _decimal(item, "weekly_discount_percent", error)
+    if percent is None:
+        return Decimal(0)
+    if not 0 <= percent <= HUNDRED:
+        raise InvalidPrice(error)
+    return percent
+
+
+def _deposit(item):
+    error = "Caution de l'article invalide"
+    deposit = _decimal(item, "deposit_required", error)
+    if deposit is None:
+        return Decimal(0)
+    if deposit < 0:
+        raise InvalidPrice(error)
+    return deposit
+
+
+def _money(value):
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def quote(item, start, end):
+    """
+    Chiffre la location d'un article sur une période
+
+    Args:
+        item (dict): Données de l'article (price_per_day, weekly_discount_percent, deposit_required)
+        start (date): Premier jour
+        end (date): Dernier jour (inclus)
+
+    Returns:
+        dict: days, price_per_day, subtotal, discount, total, deposit (montants en Decimal)
+
+    Raises:
+        ValueError: Si la date de fin précède la date de début
+        InvalidPrice: Si le prix par jour est absent ou n'est pas strictement positif,
+            si la remise n'est pas entre 0 et 100 ou si la caution est négative
+    """
+    days = (end - start).days + 1  # + 1 pour ajouter le dernier jour
+    if days <= 0:
+        raise ValueError("La date de fin doit être après la date de début.")
+
+    price_per_day = _price_per_day(item)
+    weekly_discount_percent = _weekly_discount_percent(item)
+    deposit = _deposit(item)
+
+    subtotal = price_per_day * days
+    discounted_days = (days // 7) * 7
+    discount = _money(price_per_day * discounted_days * weekly_discount_percent / HUNDRED)
+
+    return {
+        "days": days,
+        "price_per_day": _money(price_per_day),
+        "subtotal": _money(subtotal),
+        "discount": discount,
+        "total": _money(subtotal) - discount,
+        "deposit": _money(deposit)
+    }
+
+
+def to_json(result):
+    """
+    Devis sérialisable : montants en chaînes pour rester exacts
+    """
+    return {key: str(value) if isinstance(value, Decimal) else value for key, value in result.items()}
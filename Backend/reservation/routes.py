@@ -1,23 +1,33 @@
-from flask import Flask, jsonify, request, Blueprint
-from models import db, Reservation
+from flask import Flask, jsonify, request, Blueprint, Response, current_app, stream_with_context
+from models import db, Reservation, BLOCKING_STATUSES
+from pagination import apply_filters, keyset_page, iter_ndjson, InvalidCursor, DEFAULT_PER_PAGE, MAX_PER_PAGE
+from availability_calendar import calendar_cache, occupancy, MAX_RANGE_DAYS
+from booking import (
+    lock_item, is_lock_conflict, is_valid_idempotency_key, request_fingerprint, find_stored_response, store_response, IdempotencyKeyMismatch
+)
+from sqlalchemy.exc import IntegrityError, OperationalError
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import requests
+from service_client import (
+    get_car, fetch_car, remember_car, fetch_user, item_cache, ServiceUnavailable,
+    SERVICE_TOKEN_HEADER, valid_service_token
+)
+from fanout import fan_out
+from quote import quote, parse_day, to_json as quote_to_json, InvalidPrice
 from datetime import datetime, timedelta
 
 reservation_bp = Blueprint('reservations', __name__)
 
-# URL des microservices
-USER_SERVICE_URL = "http://user_service:5000"  # URL du service utilisateur
-CAR_SERVICE_URL = "http://car_service:5001"  # URL du service voiture
+# Nombre maximum d'articles par requête de disponibilité groupée
+MAX_AVAILABILITY_BATCH = 1000
 
-#Fonction pour calculer le prix total de la location
-def calculate_total_price(start_date, end_date, price_per_day):
-    start = datetime.strptime(start_date, "%Y-%m-%d").date()
-    end = datetime.strptime(end_date, "%Y-%m-%d").date()
-    days = (end - start).days + 1  # + 1 pour ajouter le dernier jour
-    if days < 0:
-        raise ValueError("La date de fin doit être après la date de début.")
-    return days * price_per_day
+# Nombre de tentatives d'une création de réservation en cas d'interblocage
+LOCK_CONFLICT_RETRIES = 3
+
+# Nombre maximum de lignes par demande de devis groupée
+MAX_QUOTE_BATCH = 200
+
+# Nombre de threads du pool d'appels occupés au plus par une demande de devis groupée
+QUOTE_MAX_CONCURRENCY = 4
 
 #Fonction qui vérifie si la voiture est disponible pour des dates spécifiques
 def is_car_available(car_id, start_date, end_date):
@@ -26,36 +36,76 @@ def is_car_available(car_id, start_date, end_date):
     
     # Vérifier si la voiture existe et est marquée comme disponible
     try:
-        response = requests.get(f"{CAR_SERVICE_URL}/car/{car_id}")
-
-        if response.status_code != 200:
+        car_data = get_car(car_id)
+        if car_data is None:
             return False
-        car_data = response.json()
         if not car_data.get('is_available', False):
             return False
     except Exception as e:   
         return False
     
     # Vérifier si la voiture n'est pas réservée quelque part d'autre
-    overlapping_reservations = Reservation.query.filter(
+    return not has_overlapping_reservation(car_id, start, end)
+
+#Fonction qui teste l'existence d'une réservation qui chevauche la période
+#EXISTS s'arrête à la première ligne trouvée dans ix_reservation_car_status_dates
+def has_overlapping_reservation(car_id, start, end):
+    overlapping = Reservation.query.filter(
         Reservation.car_id == car_id,
-        Reservation.status.in_(['pending', 'confirmed']),
-        db.or_(
-            db.and_(
-                Reservation.start_date <= end,
-                Reservation.end_date >= start
-            )
-        )
-    ).all()
-    
-    return len(overlapping_reservations) == 0
+        Reservation.status.in_(BLOCKING_STATUSES),
+        Reservation.start_date <= end,
+        Reservation.end_date >= start
+    )
+    return db.session.query(overlapping.exists()).scalar()
+
+#Fonction qui retourne, en une seule requête, les articles réservés sur une période
+def get_unavailable_car_ids(start, end, car_ids=None):
+    query = db.session.query(Reservation.car_id).filter(
+        Reservation.status.in_(BLOCKING_STATUSES),
+        Reservation.start_date <= end,
+        Reservation.end_date >= start
+    )
+    if car_ids is not None:
+        query = query.filter(Reservation.car_id.in_(car_ids))
+    return {car_id for car_id, in query.distinct()}
+
+#Fonction qui renvoie une page de réservations filtrée selon les paramètres de la requête
+#Query params : cursor, per_page, status, from, to, car_id
+def paginated_reservations(query):
+    try:
+        query = apply_filters(query, request.args)
+    except ValueError:
+        return jsonify({"error": "Format de date invalide. Utilisez YYYY-MM-DD"}), 400
+
+    per_page = min(max(request.args.get('per_page', DEFAULT_PER_PAGE, type=int), 1), MAX_PER_PAGE)
+    try:
+        reservations, next_cursor = keyset_page(query, request.args.get('cursor'), per_page)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "reservations": [reservation.to_dict() for reservation in reservations],
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+        "per_page": per_page
+    }), 200
 
 @reservation_bp.route('/reservations', methods=['GET'])
 @jwt_required()
 def get_all_reservations():
-    #Route et fonction pour récupérer toutes les réservations
-    reservations = Reservation.query.all()
-    return jsonify([reservation.to_dict() for reservation in reservations]), 200
+    #Route et fonction pour récupérer toutes les réservations, page par page
+    #?format=ndjson : export complet en flux, réservé aux administrateurs (ADMIN_USER_IDS)
+    if request.args.get('format') == 'ndjson':
+        user_id = int(get_jwt_identity())
+        if user_id not in current_app.config.get("ADMIN_USER_IDS", set()):
+            return jsonify({"error": "Export réservé aux administrateurs"}), 403
+        try:
+            query = apply_filters(Reservation.query, request.args)
+        except ValueError:
+            return jsonify({"error": "Format de date invalide. Utilisez YYYY-MM-DD"}), 400
+        return Response(stream_with_context(iter_ndjson(query)), mimetype='application/x-ndjson')
+
+    return paginated_reservations(Reservation.query)
 
 
 @reservation_bp.route('/reservations/user', methods=['GET'])
@@ -63,8 +113,7 @@ def get_all_reservations():
 def get_user_reservations():
     #Fonction qui récupére toutes les réservations d'un utilisateur connecté
     user_id = int(get_jwt_identity())
-    reservations = Reservation.query.filter_by(user_id=user_id).all()
-    return jsonify([reservation.to_dict() for reservation in reservations]), 200
+    return paginated_reservations(Reservation.query.filter_by(user_id=user_id))
 
 #Route qui affiche toutes les réservations d'une seule voiture ( pour le propriétaire)
 @reservation_bp.route('/reservations/car/<int:car_id>', methods=['GET'])
@@ -73,11 +122,9 @@ def get_car_reservations(car_id):
     user_id = int(get_jwt_identity())
     # Vérifier si l'utilisateur est le propriétaire de la voiture
     try:
-        response = requests.get(f"{CAR_SERVICE_URL}/car/{car_id}")
-        if response.status_code != 200:
+        car_data = get_car(car_id)
+        if car_data is None:
             return jsonify({"error": "Voiture non trouvée"}), 404
-        
-        car_data = response.json()
         if car_data.get('owner_id') != user_id:
             return jsonify({"error": "Vous n'êtes pas autorisé à voir ces réservations"}), 403
     except Exception as e:
@@ -101,9 +148,8 @@ def get_reservation(reservation_id):
     
     # Vérifier si l'utilisateur est le propriétaire de la voiture
     try:
-        response = requests.get(f"{CAR_SERVICE_URL}/car/{reservation.car_id}")
-        if response.status_code == 200:
-            car_data = response.json()
+        car_data = get_car(reservation.car_id)
+        if car_data is not None:
             if car_data.get('owner_id') == user_id:
                 return jsonify(reservation.to_dict()), 200
     except Exception:
@@ -115,9 +161,13 @@ def get_reservation(reservation_id):
 @reservation_bp.route('/reservations/create', methods=['POST'])
 @jwt_required()
 def create_reservation():
+    #Les réservations d'un même article sont sérialisées (verrou par article)
+    #En-tête optionnel Idempotency-Key : une nouvelle tentative rejoue le premier résultat
 
     user_id = int(get_jwt_identity())
-    data = request.get_json() or {}
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Le corps doit être un objet JSON"}), 400
     
     # Vérifier les champs requis
     for field in ['car_id', 'start_date', 'end_date']:
@@ -125,53 +175,123 @@ def create_reservation():
             return jsonify({"error": f"Le champ {field} est requis"}), 400
     
     car_id = data['car_id']
+    # Entier strict : sert de clé à la ligne de verrou ('1' et 1 ne s'excluraient pas)
+    if not isinstance(car_id, int) or isinstance(car_id, bool):
+        return jsonify({"error": "car_id doit être un identifiant entier"}), 400
     start_date = data['start_date']
     end_date = data['end_date']
     
+    idempotency_key = request.headers.get('Idempotency-Key')
+    if idempotency_key is not None and not is_valid_idempotency_key(idempotency_key):
+        return jsonify({"error": "Idempotency-Key invalide : 1 à 255 caractères parmi lettres, chiffres et - _ . :"}), 400
+    fingerprint = request_fingerprint(data) if idempotency_key else None
+    if idempotency_key:
+        try:
+            stored = find_stored_response(user_id, idempotency_key, fingerprint)
+        except IdempotencyKeyMismatch:
+            return jsonify({"error": "Cette Idempotency-Key a déjà été utilisée pour une autre requête"}), 422
+        if stored is not None:
+            return jsonify(stored[0]), stored[1]
     
-    # Vérifier si la voiture est disponible
-    if not is_car_available(car_id, start_date, end_date):
-        return jsonify({"error": "La voiture n'est pas disponible pour ces dates"}), 409
-    
-    # Récupérer le prix par jour de la voiture
     try:
-        response = requests.get(f"{CAR_SERVICE_URL}/car/{car_id}")
-        if response.status_code != 200:
-            return jsonify({"error": "Voiture non trouvée"}), 404
-        
-        car_data = response.json()
-        price_per_day = car_data.get('price_per_day')
-        
-        # Vérifier que l'utilisateur n'est pas le propriétaire de la voiture
-        if car_data.get('owner_id') == user_id:
-            return jsonify({"error": "Vous ne pouvez pas réserver votre propre voiture"}), 400
-        
+        start = parse_day(start_date)
+        end = parse_day(end_date)
+    except ValueError:
+        return jsonify({"error": "Format de date invalide. Utilisez YYYY-MM-DD"}), 400
+    if end < start:
+        return jsonify({"error": "La date de fin doit être après la date de début."}), 400
+    
+    # Article et utilisateur sont récupérés en parallèle pendant la pré-vérification
+    # du chevauchement (rapide, sans verrou) ; l'utilisateur n'est rejeté que si
+    # le service utilisateur répond qu'il n'existe pas
+    downstream = fan_out({
+        'car': lambda: fetch_car(car_id),
+        'user': lambda: fetch_user(user_id)
+    }, optional=('user',))
+    overlapping = has_overlapping_reservation(car_id, start, end)
+    try:
+        results = downstream.wait()
+    except ServiceUnavailable as e:
+        return jsonify({"error": f"Service des articles indisponible: {str(e)}"}), 503
     except Exception as e:
         return jsonify({"error": f"Erreur lors de la récupération des informations de la voiture: {str(e)}"}), 500
     
-    start = datetime.strptime(start_date, "%Y-%m-%d").date()
-    end = datetime.strptime(end_date, "%Y-%m-%d").date() 
-    total_price = calculate_total_price(start_date, end_date, price_per_day)
-    
-    new_reservation = Reservation(
-        car_id=car_id,
-        user_id=user_id,
-        start_date=start,
-        end_date=end,
-        total_price=total_price,
-        status='pending'  # Statut initial en attente de confirmation
-    )
+    car_data = results['car']
+    remember_car(car_id, car_data)
+    if car_data is None or not car_data.get('is_available', False) or overlapping:
+        return jsonify({"error": "La voiture n'est pas disponible pour ces dates"}), 409
+    if results['user'] is None and downstream.succeeded('user'):
+        return jsonify({"error": "Utilisateur non trouvé"}), 404
+    # Vérifier que l'utilisateur n'est pas le propriétaire de la voiture
+    if car_data.get('owner_id') == user_id:
+        return jsonify({"error": "Vous ne pouvez pas réserver votre propre voiture"}), 400
     
     try:
-        db.session.add(new_reservation)
-        db.session.commit()
+        total_price = quote(car_data, start, end)['total']
+    except InvalidPrice as e:
+        # Règles de prix mal renseignées par le service des articles : pas de total faux
+        return jsonify({"error": str(e)}), 502
+    
+    for attempt in range(LOCK_CONFLICT_RETRIES):
+        try:
+            # Les appels réseau sont faits : le verrou n'est tenu que le temps
+            # de la vérification définitive et de l'insertion, dans une transaction
+            # neuve (les lectures de la pré-vérification ne doivent pas la précéder)
+            db.session.rollback()
+            lock_item(car_id)
         
-        # TODO: Envoyer une notification au propriétaire de la voiture
+            if idempotency_key:
+                # Une tentative concurrente avec la même clé a pu réussir entre-temps
+                stored = find_stored_response(user_id, idempotency_key, fingerprint)
+                if stored is not None:
+                    db.session.rollback()
+                    return jsonify(stored[0]), stored[1]
         
-        return jsonify(new_reservation.to_dict()), 201
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": f"Erreur lors de la création de la réservation: {str(e)}"}), 500
+            if has_overlapping_reservation(car_id, start, end):
+                db.session.rollback()
+                return jsonify({"error": "La voiture n'est pas disponible pour ces dates"}), 409
+        
+            new_reservation = Reservation(
+                car_id=car_id,
+                user_id=user_id,
+                start_date=start,
+                end_date=end,
+                total_price=total_price,
+                status='pending'  # Statut initial en attente de confirmation
+            )
+            db.session.add(new_reservation)
+            db.session.flush()
+        
+            response_body = new_reservation.to_dict()
+            if idempotency_key:
+                store_response(user_id, idempotency_key, fingerprint, response_body, 201)
+        
+            db.session.commit()
+            calendar_cache.reservation_changed(new_reservation)
+        
+            # TODO: Envoyer une notification au propriétaire de la voiture
+        
+            return jsonify(response_body), 201
+        except OperationalError as e:
+            # Interblocage ou délai d'attente de verrou : la transaction est retentée
+            db.session.rollback()
+            if not is_lock_conflict(e):
+                return jsonify({"error": f"Erreur lors de la création de la réservation: {str(e)}"}), 500
+            if attempt + 1 == LOCK_CONFLICT_RETRIES:
+                return jsonify({"error": "Conflit lors de la création de la réservation, réessayez"}), 409
+        except IdempotencyKeyMismatch:
+            db.session.rollback()
+            return jsonify({"error": "Cette Idempotency-Key a déjà été utilisée pour une autre requête"}), 422
+        except IntegrityError:
+            # Même Idempotency-Key enregistrée par une tentative concurrente
+            db.session.rollback()
+            stored = find_stored_response(user_id, idempotency_key, fingerprint) if idempotency_key else None
+            if stored is not None:
+                return jsonify(stored[0]), stored[1]
+            return jsonify({"error": "Conflit lors de la création de la réservation, réessayez"}), 409
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({"error": f"Erreur lors de la création de la réservation: {str(e)}"}), 500
 
 #Route PUT pour confirmer une réservation   
 @reservation_bp.route('/reservations/<int:reservation_id>/confirm', methods=['PUT'])
@@ -187,11 +307,9 @@ def confirm_reservation(reservation_id):
     
     # Vérifier que l'utilisateur est le propriétaire de la voiture
     try:
-        response = requests.get(f"{CAR_SERVICE_URL}/car/{reservation.car_id}")
-        if response.status_code != 200:
+        car_data = get_car(reservation.car_id)
+        if car_data is None:
             return jsonify({"error": "Voiture non trouvée"}), 404
-        
-        car_data = response.json()
         if car_data.get('owner_id') != user_id:
             return jsonify({"error": "Vous n'êtes pas autorisé à confirmer cette réservation"}), 403
     except Exception as e:
@@ -203,6 +321,7 @@ def confirm_reservation(reservation_id):
     
     try:
         db.session.commit()
+        calendar_cache.reservation_changed(reservation)
         
         # TODO: Envoyer une notification au locataire
         
@@ -220,16 +339,15 @@ def cancel_reservation(reservation_id):
     reservation = Reservation.query.get_or_404(reservation_id)
     
     # Vérifier que la réservation n'est pas déjà terminée ou annulée
-    if reservation.status in ['cancelled', 'completed']:
+    if reservation.status in ['cancelled', 'completed', 'expired']:
         return jsonify({"error": f"La réservation est déjà {reservation.status}"}), 400
     
     # Vérifier que l'utilisateur est soit le locataire, soit le propriétaire de la voiture
     is_owner = False
     if reservation.user_id != user_id:
         try:
-            response = requests.get(f"{CAR_SERVICE_URL}/car/{reservation.car_id}")
-            if response.status_code == 200:
-                car_data = response.json()
+            car_data = get_car(reservation.car_id)
+            if car_data is not None:
                 if car_data.get('owner_id') == user_id:
                     is_owner = True
                 else:
@@ -245,6 +363,7 @@ def cancel_reservation(reservation_id):
     
     try:
         db.session.commit()
+        calendar_cache.reservation_changed(reservation)
         
         # TODO: Envoyer une notification au locataire ou au propriétaire
         #notify_user_id = reservation.user_id if is_owner else None  # ID du propriétaire à récupérer
@@ -268,11 +387,9 @@ def complete_reservation(reservation_id):
     
     # Vérifier que l'utilisateur est le propriétaire de la voiture
     try:
-        response = requests.get(f"{CAR_SERVICE_URL}/car/{reservation.car_id}")
-        if response.status_code != 200:
+        car_data = get_car(reservation.car_id)
+        if car_data is None:
             return jsonify({"error": "Voiture non trouvée"}), 404
-        
-        car_data = response.json()
         if car_data.get('owner_id') != user_id:
             return jsonify({"error": "Vous n'êtes pas autorisé à terminer cette réservation"}), 403
     except Exception as e:
@@ -284,6 +401,7 @@ def complete_reservation(reservation_id):
     
     try:
         db.session.commit()
+        calendar_cache.reservation_changed(reservation)
         
         # TODO: Envoyer une notification au locataire pour laisser un avis
         
@@ -309,4 +427,175 @@ def check_availability():
     except ValueError:
         return jsonify({"error": "Format de date invalide. Utilisez YYYY-MM-DD"}), 400
     except Exception as e:
-        return jsonify({"error": f"Erreur lors de la vérification de la disponibilité: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Erreur lors de la vérification de la disponibilité: {str(e)}"}), 500
+
+#Route pour vérifier la disponibilité de plusieurs articles en une seule requête
+#Body JSON: {"car_ids": [1, 2, 3], "start_date": "2024-01-15", "end_date": "2024-01-20"}
+#Sans car_ids, renvoie tous les articles réservés sur la période (filtrage côté appelant)
+@reservation_bp.route('/reservations/availability', methods=['POST'])
+def check_availability_batch():
+
+    data = request.get_json() or {}
+    start_date = data.get('start_date')
+    end_date = data.get('end_date')
+    car_ids = data.get('car_ids')
+
+    if not all([start_date, end_date]):
+        return jsonify({"error": "Les champs start_date et end_date sont requis"}), 400
+    if car_ids is not None:
+        if not isinstance(car_ids, list) or not all(isinstance(car_id, int) for car_id in car_ids):
+            return jsonify({"error": "car_ids doit être une liste d'identifiants"}), 400
+        if len(car_ids) > MAX_AVAILABILITY_BATCH:
+            return jsonify({"error": f"Au plus {MAX_AVAILABILITY_BATCH} articles par requête"}), 400
+
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "Format de date invalide. Utilisez YYYY-MM-DD"}), 400
+    if end < start:
+        return jsonify({"error": "La date de fin doit être après la date de début."}), 400
+
+    try:
+        unavailable = get_unavailable_car_ids(start, end, car_ids)
+        response = {"unavailable_ids": sorted(unavailable)}
+        if car_ids is not None:
+            response["available_ids"] = [car_id for car_id in dict.fromkeys(car_ids) if car_id not in unavailable]
+        return jsonify(response), 200
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la vérification de la disponibilité: {str(e)}"}), 500
+
+#Route qui compte les réservations actives (pending, confirmed) de plusieurs articles
+#en une seule requête groupée (suppression de publication, tableau de bord propriétaire)
+#Body JSON: {"car_ids": [1, 2, 3]}
+@reservation_bp.route('/reservations/counts', methods=['POST'])
+def count_active_reservations():
+
+    data = request.get_json() or {}
+    car_ids = data.get('car_ids')
+    if not isinstance(car_ids, list) or not all(isinstance(car_id, int) for car_id in car_ids):
+        return jsonify({"error": "car_ids doit être une liste d'identifiants"}), 400
+    if len(car_ids) > MAX_AVAILABILITY_BATCH:
+        return jsonify({"error": f"Au plus {MAX_AVAILABILITY_BATCH} articles par requête"}), 400
+
+    try:
+        counts = {car_id: {status: 0 for status in BLOCKING_STATUSES} for car_id in car_ids}
+        rows = db.session.query(
+            Reservation.car_id, Reservation.status, db.func.count(Reservation.id)
+        ).filter(
+            Reservation.car_id.in_(car_ids),
+            Reservation.status.in_(BLOCKING_STATUSES)
+        ).group_by(Reservation.car_id, Reservation.status)
+        for car_id, status, count in rows:
+            counts[car_id][status] = count
+
+        return jsonify({"counts": {
+            str(car_id): dict(by_status, active=sum(by_status.values()))
+            for car_id, by_status in counts.items()
+        }}), 200
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors du comptage des réservations: {str(e)}"}), 500
+
+#Route qui chiffre plusieurs locations en un seul appel (calculateur de prix,
+#page de résultats de recherche), montants exacts renvoyés en chaînes
+#Body JSON: {"items": [{"car_id": 1, "start_date": "YYYY-MM-DD", "end_date": "YYYY-MM-DD"}, ...]}
+@reservation_bp.route('/reservations/quote', methods=['POST'])
+def quote_batch():
+
+    data = request.get_json() or {}
+    lines = data.get('items')
+    if not isinstance(lines, list) or not lines:
+        return jsonify({"error": "items doit être une liste non vide"}), 400
+    if len(lines) > MAX_QUOTE_BATCH:
+        return jsonify({"error": f"Au plus {MAX_QUOTE_BATCH} lignes par requête"}), 400
+
+    periods = []
+    for position, line in enumerate(lines):
+        if not isinstance(line, dict) or not isinstance(line.get('car_id'), int):
+            return jsonify({"error": f"Ligne {position} : car_id est requis"}), 400
+        try:
+            start, end = parse_day(line.get('start_date')), parse_day(line.get('end_date'))
+        except ValueError as e:
+            return jsonify({"error": f"Ligne {position} : {str(e)}"}), 400
+        if end < start:
+            return jsonify({"error": f"Ligne {position} : La date de fin doit être après la date de début."}), 400
+        periods.append((line['car_id'], start, end))
+
+    # Chaque article n'est récupéré qu'une fois, sur quelques threads du pool
+    # pour ne pas retarder les appels des autres requêtes
+    car_ids = list(dict.fromkeys(car_id for car_id, _, _ in periods))
+    try:
+        cars = fan_out(
+            {car_id: (lambda car_id=car_id: fetch_car(car_id)) for car_id in car_ids},
+            max_concurrency=QUOTE_MAX_CONCURRENCY
+        ).wait()
+    except ServiceUnavailable as e:
+        return jsonify({"error": f"Service des articles indisponible: {str(e)}"}), 503
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la récupération des articles: {str(e)}"}), 500
+
+    quotes = []
+    for car_id, start, end in periods:
+        line = {"car_id": car_id, "start_date": start.isoformat(), "end_date": end.isoformat()}
+        if cars[car_id] is None:
+            line["error"] = "Article non trouvé"
+        else:
+            try:
+                line.update(quote_to_json(quote(cars[car_id], start, end)))
+            except InvalidPrice as e:
+                line["error"] = str(e)
+        quotes.append(line)
+    return jsonify({"quotes": quotes}), 200
+
+#Route appelée par le service publications quand des articles changent
+#(propriétaire, prix, disponibilité) pour vider le cache local
+#En-tête X-Service-Token : jeton partagé SERVICE_TOKEN
+#Body JSON: {"ids": [1, 2, 3]}
+@reservation_bp.route('/reservations/items/invalidate', methods=['POST'])
+def invalidate_items():
+
+    if not valid_service_token(request.headers.get(SERVICE_TOKEN_HEADER), current_app.config.get("SERVICE_TOKEN")):
+        return jsonify({"error": "Jeton de service absent ou invalide"}), 403
+
+    data = request.get_json(silent=True)
+    item_ids = data.get('ids') if isinstance(data, dict) else None
+    if not isinstance(item_ids, list) or not all(
+        isinstance(item_id, int) and not isinstance(item_id, bool) for item_id in item_ids
+    ):
+        return jsonify({"error": "ids doit être une liste d'identifiants"}), 400
+
+    removed = item_cache.invalidate(item_ids)
+    return jsonify({"invalidated": removed}), 200
+
+#Route qui renvoie l'occupation d'un article sur une période en un seul appel
+#(intervalles réservés et bitmap '0'/'1' par jour, pour les calendriers du frontend)
+#Query params: from=YYYY-MM-DD, to=YYYY-MM-DD (inclus, 366 jours maximum)
+@reservation_bp.route('/reservations/calendar/<int:car_id>', methods=['GET'])
+def get_calendar(car_id):
+
+    from_date = request.args.get('from')
+    to_date = request.args.get('to')
+    if not all([from_date, to_date]):
+        return jsonify({"error": "Les paramètres from et to sont requis"}), 400
+
+    try:
+        start = datetime.strptime(from_date, "%Y-%m-%d").date()
+        end = datetime.strptime(to_date, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "Format de date invalide. Utilisez YYYY-MM-DD"}), 400
+    if end < start:
+        return jsonify({"error": "La date de fin doit être après la date de début."}), 400
+    if (end - start).days >= MAX_RANGE_DAYS:
+        return jsonify({"error": f"La période ne peut pas dépasser {MAX_RANGE_DAYS} jours"}), 400
+
+    try:
+        intervals, bitmap = occupancy(calendar_cache.get(car_id), start, end)
+        return jsonify({
+            "car_id": car_id,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "booked": [{"start": s.isoformat(), "end": e.isoformat()} for s, e in intervals],
+            "occupancy": bitmap
+        }), 200
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la récupération du calendrier: {str(e)}"}), 500
@@ -0,0 +1,248 @@
+"""
+Client HTTP partagé pour les appels aux autres microservices
+
+Chaque handler ouvrait une nouvelle connexion (`requests.get`) sans délai
+maximum, parfois deux fois pour le même article. Ici :
+- une `requests.Session` par processus garde les connexions ouvertes
+  (keep-alive) dans un pool, ce qui évite une poignée de main TCP+HTTP par appel
+- chaque appel a un délai de connexion et de lecture
+- un même article n'est récupéré qu'une fois par requête HTTP entrante
+  (mémorisation dans `flask.g`)
+- les métadonnées des articles (propriétaire, prix...) sont gardées dans un
+  cache LRU borné avec durée de vie courte, vidé par les notifications de
+  modification du service publications : les vérifications de propriétaire
+  ne font plus d'appel réseau dans le cas courant
+
+Un article est lu sur le réseau hors du verrou du cache : un compteur de
+générations, incrémenté à chaque invalidation, empêche un appel en cours
+pendant une notification de remettre en cache l'ancienne version.
+
+Les routes appelées par les autres services (notifications) exigent le jeton
+partagé SERVICE_TOKEN dans l'en-tête X-Service-Token.
+"""
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from flask import g
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# URL du service qui expose les articles réservables
+CAR_SERVICE_URL = os.environ.get("CAR_SERVICE_URL", "http://car_service:5001")
+
+# URL du service utilisateur
+USER_SERVICE_URL = os.environ.get("USER_SERVICE_URL", "http://user_service:5000")
+
+# Délais (secondes) : établissement de la connexion, puis lecture de la réponse
+CONNECT_TIMEOUT = float(os.environ.get("SERVICE_CONNECT_TIMEOUT", 1.0))
+READ_TIMEOUT = float(os.environ.get("SERVICE_READ_TIMEOUT", 3.0))
+
+# Nombre de connexions gardées ouvertes par service distant
+POOL_SIZE = int(os.environ.get("SERVICE_POOL_SIZE", 20))
+
+# Cache des articles : durée de vie (secondes) et nombre maximum d'entrées
+ITEM_CACHE_TTL = float(os.environ.get("ITEM_CACHE_TTL", 60))
+ITEM_CACHE_MAX_ENTRIES = int(os.environ.get("ITEM_CACHE_MAX_ENTRIES", 10000))
+
+# En-tête portant le jeton partagé entre services
+SERVICE_TOKEN_HEADER = "X-Service-Token"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class ServiceUnavailable(Exception):
+    """
+    Le service distant n'a pas répondu (connexion refusée, délai dépassé...)
+    """
+
+
+def get_session():
+    """
+    Retourne la session partagée du processus, créée au premier appel
+
+    Returns:
+        requests.Session: Session avec pool de connexions keep-alive
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # Une seule nouvelle tentative, uniquement si la connexion échoue
+                retry = Retry(total=1, connect=1, read=0, status=0, backoff_factor=0.05, allowed_methods=["GET"])
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=retry)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def get_json(url):
+    """
+    GET avec délais sur la session partagée
+
+    Args:
+        url (str): URL complète
+
+    Returns:
+        tuple: (code HTTP, corps JSON ou None)
+
+    Raises:
+        ServiceUnavailable: Si le service ne répond pas
+    """
+    try:
+        response = get_session().get(url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+    except requests.RequestException as e:
+        raise ServiceUnavailable(str(e)) from e
+    if response.status_code != 200:
+        return response.status_code, None
+    return response.status_code, response.json()
+
+
+class ItemCache:
+    """
+    Cache LRU des métadonnées d'articles avec expiration
+
+    Partagé par toutes les requêtes du processus ; les articles inexistants
+    ne sont pas mis en cache.
+    """
+
+    def __init__(self, ttl=ITEM_CACHE_TTL, max_entries=ITEM_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def generation(self):
+        """
+        Génération courante, à lire avant de récupérer un article sur le réseau
+        """
+        with self._lock:
+            return self._generation
+
+    def get(self, item_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(item_id)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self._entries[item_id]
+                return None
+            self._entries.move_to_end(item_id)
+            return entry[0]
+
+    def set(self, item_id, data, generation=None):
+        """
+        Met un article en cache, sauf si une invalidation a eu lieu depuis
+        la lecture de `generation`
+        """
+        if not self.ttl:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries.pop(item_id, None)
+            while len(self._entries) >= self.max_entries:
+                self._entries.popitem(last=False)
+            self._entries[item_id] = (data, time.monotonic() + self.ttl)
+
+    def invalidate(self, item_ids):
+        """
+        Retire des articles du cache
+
+        Returns:
+            int: Nombre d'entrées retirées
+        """
+        with self._lock:
+            self._generation += 1
+            return sum(self._entries.pop(item_id, None) is not None for item_id in item_ids)
+
+
+item_cache = ItemCache()
+
+
+def fetch_car(car_id):
+    """
+    Récupère un article depuis le cache du processus ou le service distant,
+    sans contexte Flask (utilisable depuis le pool de fanout)
+
+    Args:
+        car_id (int): ID de l'article
+
+    Returns:
+        dict: Données de l'article, ou None s'il n'existe pas
+
+    Raises:
+        ServiceUnavailable: Si le service ne répond pas
+    """
+    car = item_cache.get(car_id)
+    if car is None:
+        generation = item_cache.generation
+        _, car = get_json(f"{CAR_SERVICE_URL}/car/{car_id}")
+        if car is not None:
+            item_cache.set(car_id, car, generation)
+    return car
+
+
+def valid_service_token(provided, expected):
+    """
+    Compare en temps constant le jeton reçu au jeton configuré ; refuse tout
+    si aucun jeton n'est configuré
+    """
+    if not expected or provided is None:
+        return False
+    return hmac.compare_digest(provided.encode("utf-8"), expected.encode("utf-8"))
+
+
+def remember_car(car_id, car):
+    """
+    Mémorise pour la requête en cours un article récupéré par fetch_car
+    """
+    g.setdefault("_car_lookups", {})[car_id] = car
+
+
+def get_car(car_id):
+    """
+    Récupère un article : mémorisation par requête, puis cache du processus,
+    puis appel au service distant
+
+    Args:
+        car_id (int): ID de l'article
+
+    Returns:
+        dict: Données de l'article, ou None s'il n'existe pas
+
+    Raises:
+        ServiceUnavailable: Si le service ne répond pas (non mémorisé)
+    """
+    lookups = g.setdefault("_car_lookups", {})
+    if car_id not in lookups:
+        lookups[car_id] = fetch_car(car_id)
+    return lookups[car_id]
+
+
+def fetch_user(user_id):
+    """
+    Récupère un utilisateur depuis le service utilisateur
+
+    Args:
+        user_id (int): ID de l'utilisateur
+
+    Returns:
+        dict: Données de l'utilisateur, ou None s'il n'existe pas
+
+    Raises:
+        ServiceUnavailable: Si le service ne répond pas
+    """
+    status_code, user = get_json(f"{USER_SERVICE_URL}/users/{user_id}")
+    if status_code not in (200, 404):
+        raise ServiceUnavailable(f"HTTP {status_code}")
+    return user
@@ -1,5 +1,9 @@
 from flask import Flask
 from models import db, User
+import click
+from password_hashing import (
+    password_hasher, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT, PASSWORD_HASH_METHOD, BENCHMARK_METHODS
+)
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager  # Correction de l'import
 from flask_cors import CORS
@@ -24,7 +28,10 @@ mysql_database = os.environ.get("MYSQL_DATABASE", "projet5_user")
 
 def create_app():
     app = Flask(__name__)
-    app.config["SQLALCHEMY_DATABASE_URI"] = (f"mysql+pymysql://{mysql_user}:{mysql_password}@{mysql_host}:3306/{mysql_database}")
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
+        "DATABASE_URL",
+        f"mysql+pymysql://{mysql_user}:{mysql_password}@{mysql_host}:3306/{mysql_database}"
+    )
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     CORS(app, origins=["http://localhost:3000"])
 
@@ -32,12 +39,35 @@ def create_app():
     app.config["JWT_SECRET_KEY"] = "cle_secrete"
     jwt.init_app(app)
 
+    # Utilisateurs autorisés à exporter tous les comptes (IDs séparés par des virgules)
+    app.config["ADMIN_USER_IDS"] = {
+        int(user_id) for user_id in os.environ.get("ADMIN_USER_IDS", "").split(",") if user_id.strip()
+    }
+
+    # Pool de processus de hachage des mots de passe (0 worker : calcul dans la requête)
+    app.config["PASSWORD_HASH_WORKERS"] = PASSWORD_HASH_WORKERS
+    app.config["PASSWORD_HASH_QUEUE_LIMIT"] = PASSWORD_HASH_QUEUE_LIMIT
+    # Algorithme et coût des hashs, ex. "scrypt:32768:8:1" (vide : défaut de werkzeug)
+    app.config["PASSWORD_HASH_METHOD"] = PASSWORD_HASH_METHOD
+    password_hasher.init_app(app)
+
     db.init_app(app)
     migrate.init_app(app, db)   
 
     with app.app_context():
         db.create_all()
 
+    # Latence d'un hash par méthode : flask --app app bench-password-hash [-m scrypt:65536:8:1 ...]
+    @app.cli.command("bench-password-hash")
+    @click.option("--method", "-m", "methods", multiple=True, help="Méthode werkzeug à mesurer")
+    @click.option("--rounds", default=5, show_default=True, help="Hashs par méthode")
+    def bench_password_hash(methods, rounds):
+        from password_hashing import benchmark
+        current = password_hasher.method
+        print(f"Méthode courante : {current or 'défaut werkzeug'} ({password_hasher.parameters})")
+        for method, parameters, latency in benchmark(list(methods) or BENCHMARK_METHODS, rounds):
+            print(f"{parameters:<28}{latency * 1000:>10.1f} ms")
+
     from routes import user_bp as user_bp_blueprint
     app.register_blueprint(user_bp_blueprint)
 
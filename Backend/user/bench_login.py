@@ -0,0 +1,109 @@
+"""
+Benchmark du débit de connexion selon la taille du pool de hachage
+
+Crée des utilisateurs dans une base SQLite temporaire puis lance des rafales
+de connexions concurrentes sur /users/login pour chaque taille de pool
+(0 = hachage dans le thread de la requête, puis 1, 2, 4... jusqu'au nombre
+de cœurs). Pendant chaque rafale, /users/me est appelé en boucle pour mesurer
+la latence d'une route rapide.
+
+Usage :
+    python bench_login.py [--users 8] [--logins 64] [--concurrency 16]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _pool_sizes():
+    cores = os.cpu_count() or 1
+    sizes = [0]
+    size = 1
+    while size < cores:
+        sizes.append(size)
+        size *= 2
+    sizes.append(cores)
+    return sizes
+
+
+def _burst(client, emails, logins, concurrency, token):
+    stop = threading.Event()
+    me_latencies = []
+
+    def probe_me():
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.get('/users/me', headers={'Authorization': f'Bearer {token}'})
+            me_latencies.append(time.perf_counter() - start)
+
+    def login(position):
+        response = client.post('/users/login', json={
+            'email': emails[position % len(emails)],
+            'password': 'mot-de-passe'
+        })
+        return response.status_code
+
+    prober = threading.Thread(target=probe_me, daemon=True)
+    prober.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        statuses = list(executor.map(login, range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    prober.join()
+
+    return elapsed, statuses, me_latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--logins', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from models import db, User
+    from password_hashing import password_hasher
+
+    app = create_app()
+    client = app.test_client()
+    emails = [f'bench{i}@example.com' for i in range(args.users)]
+    with app.app_context():
+        password_hasher.configure(0, 1)
+        for email in emails:
+            if User.query.filter_by(email=email).first() is None:
+                db.session.add(User(first_name='Bench', last_name='User', email=email, password='mot-de-passe'))
+        db.session.commit()
+        token = create_access_token(identity=str(User.query.filter_by(email=emails[0]).first().id))
+
+    print(f"{os.cpu_count()} cœurs, {args.logins} connexions, {args.concurrency} clients simultanés")
+    print(f"{'processus':>10}{'connexions/s':>15}{'/users/me p50':>16}{'/users/me p95':>16}{'erreurs':>9}")
+    for workers in _pool_sizes():
+        # File assez grande pour mesurer le débit sans réponses 429
+        password_hasher.configure(workers, args.concurrency)
+        if workers:
+            password_hasher.hash('préchauffage')  # démarre les processus hors mesure
+        elapsed, statuses, me_latencies = _burst(client, emails, args.logins, args.concurrency, token)
+
+        quantiles = statistics.quantiles(me_latencies, n=20) if len(me_latencies) >= 2 else [0] * 19
+        errors = sum(status != 200 for status in statuses)
+        print(
+            f"{workers if workers else 'aucun':>10}"
+            f"{args.logins / elapsed:>15.1f}"
+            f"{statistics.median(me_latencies) * 1000 if me_latencies else 0:>13.1f} ms"
+            f"{quantiles[18] * 1000:>13.1f} ms"
+            f"{errors:>9}"
+        )
+    password_hasher.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,7 @@
 import datetime
 from flask_sqlalchemy import SQLAlchemy
 from flask import Flask
-from werkzeug.security import generate_password_hash, check_password_hash
+from password_hashing import password_hasher
 
 
 db = SQLAlchemy()
@@ -28,12 +28,18 @@ class User(db.Model):
     def password(self):
         raise AttributeError('Le mot de passe n\'est pas lisible')
 
+    # Hachage et vérification exécutés dans le pool de processus (voir password_hashing) ;
+    # lèvent HashingPoolSaturated si le pool est saturé
     @password.setter
     def password(self, password):
-        self._password = generate_password_hash(password)  
+        self._password = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self._password, password)  
+        return password_hasher.verify(self._password, password)
+
+    def needs_rehash(self):
+        # Hash calculé avec un autre algorithme ou un autre coût que la configuration courante
+        return password_hasher.needs_rehash(self._password)
 
 
     def to_dict(self):
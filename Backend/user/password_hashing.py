@@ -0,0 +1,209 @@
+"""
+Hachage et vérification des mots de passe hors des threads de requête
+
+generate_password_hash / check_password_hash sont volontairement lents
+(dérivation de clé coûteuse en CPU). Exécutés dans le thread de la requête,
+une rafale de connexions occupait tous les workers et bloquait les routes
+rapides comme /users/me (et, à cause du GIL, les autres threads du processus).
+
+Les calculs sont confiés à un pool de processus borné :
+- PASSWORD_HASH_WORKERS processus (par défaut le nombre de cœurs),
+  0 pour calculer dans le thread de la requête
+- au plus PASSWORD_HASH_QUEUE_LIMIT calculs en cours ou en attente ; au-delà
+  HashingPoolSaturated est levée tout de suite et la route répond 429
+
+L'algorithme et son coût sont réglables par déploiement (PASSWORD_HASH_METHOD,
+au format de werkzeug : "scrypt:32768:8:1", "pbkdf2:sha256:1000000"...). Les
+paramètres sont enregistrés en tête de chaque hash ("scrypt:32768:8:1$sel$...") :
+un hash calculé avec d'anciens paramètres est recalculé à la connexion
+suivante réussie (voir needs_rehash). `flask --app app bench-password-hash`
+mesure la latence d'un hash par méthode pour choisir le coût.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Nombre de processus de hachage (0 : calcul dans le thread de la requête)
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+
+# Nombre maximum de calculs en cours ou en attente
+PASSWORD_HASH_QUEUE_LIMIT = int(os.environ.get("PASSWORD_HASH_QUEUE_LIMIT", 4 * max(PASSWORD_HASH_WORKERS, 1)))
+
+# Algorithme et coût des nouveaux hashs (vide : valeur par défaut de werkzeug)
+PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD") or None
+
+# Méthodes comparées par défaut par le benchmark
+BENCHMARK_METHODS = [
+    "scrypt:16384:8:1",
+    "scrypt:32768:8:1",
+    "scrypt:65536:8:1",
+    "pbkdf2:sha256:600000",
+    "pbkdf2:sha256:1000000",
+]
+
+# Délai conseillé au client avant une nouvelle tentative (secondes, en-tête Retry-After)
+RETRY_AFTER_SECONDS = 1
+
+
+class HashingPoolSaturated(Exception):
+    """
+    Trop de calculs de mots de passe en attente
+    """
+
+
+class PasswordHasher:
+    """
+    Pool de processus partagé par les requêtes, créé au premier calcul
+    """
+
+    def __init__(self, workers=PASSWORD_HASH_WORKERS, queue_limit=PASSWORD_HASH_QUEUE_LIMIT,
+                 method=PASSWORD_HASH_METHOD):
+        self._executor = None
+        self._lock = threading.Lock()
+        self.configure(workers, queue_limit)
+        self.method = method
+        self._parameters = None
+
+    def init_app(self, app):
+        """
+        Applique la configuration de l'application
+
+        Args:
+            app (Flask): Application (PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT)
+        """
+        self.configure(
+            app.config.get('PASSWORD_HASH_WORKERS', self.workers),
+            app.config.get('PASSWORD_HASH_QUEUE_LIMIT', self.queue_limit)
+        )
+        self.set_method(app.config.get('PASSWORD_HASH_METHOD', self.method))
+
+    def configure(self, workers, queue_limit):
+        """
+        Change la taille du pool et de la file ; le pool existant est arrêté
+        """
+        self.shutdown()
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._slots = threading.BoundedSemaphore(queue_limit)
+
+    def set_method(self, method):
+        """
+        Change l'algorithme des nouveaux hashs
+
+        Un hash de test est calculé tout de suite : une méthode invalide
+        est refusée au démarrage plutôt qu'à la première inscription.
+
+        Raises:
+            ValueError: Si werkzeug ne connaît pas la méthode
+        """
+        self._parameters = parameters_of(_generate(method, ''))
+        self.method = method
+
+    @property
+    def parameters(self):
+        """
+        Paramètres enregistrés en tête des hashs calculés avec la méthode
+        courante (la méthode par défaut est complétée par werkzeug)
+        """
+        if self._parameters is None:
+            self._parameters = parameters_of(_generate(self.method, ''))
+        return self._parameters
+
+    def needs_rehash(self, password_hash):
+        """
+        Indique si un hash a été calculé avec d'autres paramètres que
+        ceux de la méthode courante
+        """
+        return parameters_of(password_hash) != self.parameters
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn : les processus ne copient ni les threads ni les connexions du serveur
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    def _run(self, function, *args):
+        if not self.workers:
+            return function(*args)
+
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HashingPoolSaturated()
+        try:
+            future = self._get_executor().submit(function, *args)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future.result()
+
+    def hash(self, password):
+        """
+        Calcule le hash d'un mot de passe
+
+        Raises:
+            HashingPoolSaturated: Si la file d'attente est pleine
+        """
+        return self._run(_generate, self.method, password)
+
+    def verify(self, password_hash, password):
+        """
+        Vérifie un mot de passe contre son hash
+
+        Raises:
+            HashingPoolSaturated: Si la file d'attente est pleine
+        """
+        return self._run(check_password_hash, password_hash, password)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+def _generate(method, password):
+    # Exécutée dans le pool : fonction de module, sérialisable par pickle
+    if method is None:
+        return generate_password_hash(password)
+    return generate_password_hash(password, method=method)
+
+
+def parameters_of(password_hash):
+    """
+    Algorithme et coût d'un hash werkzeug ("scrypt:32768:8:1$sel$..." -> "scrypt:32768:8:1")
+    """
+    return password_hash.split('$', 1)[0]
+
+
+def benchmark(methods, rounds=5):
+    """
+    Mesure la latence moyenne d'un hash, dans le processus courant
+
+    Args:
+        methods (list): Méthodes werkzeug à comparer
+        rounds (int): Nombre de hashs par méthode
+
+    Returns:
+        list: (méthode, paramètres enregistrés, latence moyenne en secondes)
+    """
+    results = []
+    for method in methods:
+        parameters = parameters_of(_generate(method, 'préchauffage'))
+        start = time.perf_counter()
+        for _ in range(rounds):
+            _generate(method, 'mot-de-passe')
+        results.append((method, parameters, (time.perf_counter() - start) / rounds))
+    return results
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,112 @@
+"""
+Cache des profils utilisateurs en mémoire du processus
+
+/users/me est appelé par le frontend à chaque chargement de page et
+/users/<id> par les autres services : chaque appel relisait l'utilisateur
+en base. Le profil public (User.to_dict()) est gardé dans un cache LRU borné
+avec durée de vie, vidé par update_user et delete_user. La durée de vie borne
+le décalage avec les écritures faites par un autre processus.
+
+Le profil est lu en base hors du verrou : un compteur de générations,
+incrémenté à chaque invalidation, empêche une requête qui a lu l'utilisateur
+avant une modification de remettre en cache l'ancienne version après
+l'invalidation.
+
+Chaque profil a un ETag (empreinte de son contenu) : un client qui renvoie
+If-None-Match avec l'ETag courant reçoit 304 sans corps.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Durée de vie d'un profil en cache (secondes, 0 pour désactiver) et nombre de profils gardés
+PROFILE_CACHE_TTL = float(os.environ.get("PROFILE_CACHE_TTL", 60))
+PROFILE_CACHE_MAX_ENTRIES = int(os.environ.get("PROFILE_CACHE_MAX_ENTRIES", 10000))
+
+
+def compute_etag(profile):
+    """
+    Empreinte stable d'un profil (indépendante de l'ordre des clés)
+    """
+    return hashlib.sha1(json.dumps(profile, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ProfileCache:
+    """
+    Cache LRU des profils avec expiration, partagé par les requêtes du processus
+
+    Chaque entrée est (profil, ETag, date d'expiration).
+
+    Usage :
+        generation = profile_cache.generation  # avant la lecture en base
+        cached = profile_cache.get(user_id)
+        if cached is None:
+            cached = profile_cache.set(user_id, User.query.get(user_id).to_dict(), generation)
+    """
+
+    def __init__(self, ttl=PROFILE_CACHE_TTL, max_entries=PROFILE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def generation(self):
+        """
+        Génération courante, à lire avant de charger un profil en base
+        """
+        with self._lock:
+            return self._generation
+
+    def get(self, user_id):
+        """
+        Returns:
+            tuple: (profil, ETag), ou None si absent ou expiré
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[2] <= now:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[0], entry[1]
+
+    def set(self, user_id, profile, generation=None):
+        """
+        Met un profil en cache
+
+        Args:
+            user_id (int): ID de l'utilisateur
+            profile (dict): Profil lu en base
+            generation (int): Génération lue avant la lecture en base ; si une
+                invalidation a eu lieu depuis, le profil est renvoyé sans être
+                mis en cache
+
+        Returns:
+            tuple: (profil, ETag)
+        """
+        etag = compute_etag(profile)
+        if self.ttl:
+            with self._lock:
+                if generation is not None and generation != self._generation:
+                    return profile, etag
+                self._entries.pop(user_id, None)
+                while len(self._entries) >= self.max_entries:
+                    self._entries.popitem(last=False)
+                self._entries[user_id] = (profile, etag, time.monotonic() + self.ttl)
+        return profile, etag
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+
+profile_cache = ProfileCache()
@@ -0,0 +1,68 @@
+"""
+Projection des champs publics des utilisateurs
+
+Les routes de liste acceptent une liste de champs (`fields`) : seules les
+colonnes demandées sont lues en base (tuples, sans instances ORM), puis
+renvoyées avec les mêmes clés que User.to_dict().
+
+Les champs de RESTRICTED_FIELDS (données de contact) ne sont proposés
+qu'aux appelants autorisés : les routes passent la liste `allowed` adaptée.
+"""
+from models import User
+
+# Champs de User.to_dict() -> colonne
+PUBLIC_FIELDS = {
+    "id": User.id,
+    "first_name": User.first_name,
+    "last_name": User.last_name,
+    "email": User.email,
+    "proprietaire": User.proprietaire,
+}
+
+# Champs réservés aux administrateurs dans la recherche groupée
+RESTRICTED_FIELDS = ("email",)
+
+# Champs accessibles à tout utilisateur connecté
+UNRESTRICTED_FIELDS = tuple(field for field in PUBLIC_FIELDS if field not in RESTRICTED_FIELDS)
+
+
+def parse_fields(fields, allowed=tuple(PUBLIC_FIELDS)):
+    """
+    Valide une liste de champs demandés
+
+    Args:
+        fields (list | str | None): Liste de noms, ou chaîne séparée par des virgules
+        allowed (tuple): Champs que l'appelant peut demander
+
+    Returns:
+        list: Champs à renvoyer (tous les champs autorisés si aucun n'est
+        demandé), `id` toujours inclus
+
+    Raises:
+        ValueError: Si un champ est inconnu ou non autorisé
+    """
+    if not fields:
+        return list(allowed)
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(",") if field.strip()]
+    if not isinstance(fields, list) or not all(isinstance(field, str) for field in fields):
+        raise ValueError("fields doit être une liste de noms de champs")
+
+    unknown = [field for field in fields if field not in PUBLIC_FIELDS]
+    if unknown:
+        raise ValueError(f"Champs inconnus : {', '.join(unknown)}. Champs autorisés : {', '.join(allowed)}")
+    forbidden = [field for field in fields if field not in allowed]
+    if forbidden:
+        raise ValueError(f"Champs non autorisés : {', '.join(forbidden)}. Champs autorisés : {', '.join(allowed)}")
+    return ["id"] + [field for field in dict.fromkeys(fields) if field != "id"]
+
+
+def project(query, fields):
+    """
+    Restreint une requête User aux colonnes demandées
+    """
+    return query.with_entities(*(PUBLIC_FIELDS[field] for field in fields))
+
+
+def row_to_dict(row, fields):
+    return dict(zip(fields, row))
@@ -1,21 +1,131 @@
-from flask import Blueprint, request, jsonify, abort
+from flask import Blueprint, request, jsonify, abort, current_app, Response, stream_with_context
 from models import db, User
+from password_hashing import HashingPoolSaturated, RETRY_AFTER_SECONDS
+from projection import parse_fields, project, row_to_dict, PUBLIC_FIELDS, UNRESTRICTED_FIELDS
+from profile_cache import profile_cache
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from datetime import datetime, timedelta
+import json
 
 
 user_bp = Blueprint('users', __name__)
 
+# Nombre maximum d'utilisateurs par recherche groupée
+MAX_BATCH_IDS = 500
+
+# Taille des pages de GET /users
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 200
+
+# Nombre de lignes lues par lot en mode export
+STREAM_BATCH_SIZE = 1000
+
+#Réponse 429 quand le pool de hachage des mots de passe est saturé
+def too_busy():
+    response = jsonify({"Erreur : " : "Trop de demandes en cours, réessayez dans un instant"})
+    response.headers["Retry-After"] = str(RETRY_AFTER_SECONDS)
+    return response, 429
+
+#Filtres communs de GET /users : proprietaire=true|false, created_from / created_to (YYYY-MM-DD, inclus)
+def filter_users(query, args):
+    proprietaire = args.get('proprietaire')
+    if proprietaire is not None:
+        query = query.filter(User.proprietaire == (proprietaire.lower() == 'true'))
+    created_from = args.get('created_from')
+    if created_from:
+        query = query.filter(User.created_at >= datetime.strptime(created_from, "%Y-%m-%d"))
+    created_to = args.get('created_to')
+    if created_to:
+        query = query.filter(User.created_at < datetime.strptime(created_to, "%Y-%m-%d") + timedelta(days=1))
+    return query
+
+#Liste paginée par curseur sur l'id (cursor = next_cursor de la page précédente)
+#Query params: cursor, per_page, proprietaire, created_from, created_to, fields=first_name,email
+#Réservée aux utilisateurs connectés (JWT) ; format=ndjson : export complet
+#en flux, réservé aux administrateurs (ADMIN_USER_IDS)
 @user_bp.route('/users', methods = ['GET'])
+@jwt_required()
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users]), 200
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        query = filter_users(User.query, request.args)
+    except ValueError as e:
+        return jsonify({"Erreur : " : f"Paramètre invalide : {e}"}), 400
+
+    if request.args.get('format') == 'ndjson':
+        if int(get_jwt_identity()) not in current_app.config.get("ADMIN_USER_IDS", set()):
+            return jsonify({"Erreur : " : "Export réservé aux administrateurs"}), 403
+        rows = project(query.order_by(User.id), fields).execution_options(stream_results=True).yield_per(STREAM_BATCH_SIZE)
+        lines = (json.dumps(row_to_dict(row, fields), separators=(",", ":")) + "\n" for row in rows)
+        return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+    per_page = min(max(request.args.get('per_page', DEFAULT_PER_PAGE, type=int), 1), MAX_PER_PAGE)
+    cursor = request.args.get('cursor')
+    if cursor:
+        if not cursor.isdigit():
+            return jsonify({"Erreur : " : "Curseur invalide"}), 400
+        query = query.filter(User.id > int(cursor))
+
+    # Une ligne de plus pour savoir s'il existe une page suivante
+    rows = project(query.order_by(User.id), fields).limit(per_page + 1).all()
+    users = [row_to_dict(row, fields) for row in rows[:per_page]]
+    next_cursor = str(users[-1]['id']) if len(rows) > per_page else None
+    return jsonify({
+        "users": users,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+        "per_page": per_page
+    }), 200
 
 @user_bp.route('/users/<int:user_id>', methods = ['GET'])
 def get_user(user_id):
-    user = User.query.get(user_id)
-    if not user:
-        abort(404, description = " Utilisateur non trouvé ")
-    return jsonify(user.to_dict()), 200
+    generation = profile_cache.generation
+    cached = profile_cache.get(user_id)
+    if cached is None:
+        user = User.query.get(user_id)
+        if not user:
+            abort(404, description = " Utilisateur non trouvé ")
+        cached = profile_cache.set(user_id, user.to_dict(), generation)
+    return profile_response(*cached)
+
+#Réponse d'un profil avec ETag : 304 sans corps si le client a déjà cette version (If-None-Match)
+def profile_response(profile, etag):
+    response = jsonify(profile)
+    response.set_etag(etag)
+    # Le client garde le profil mais le revalide à chaque utilisation
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response.make_conditional(request)
+
+#Recherche groupée pour les autres services (propriétaires d'annonces, locataires...)
+#Réservée aux utilisateurs connectés (JWT) ; email n'est renvoyé qu'aux administrateurs (ADMIN_USER_IDS)
+#Body JSON: {"ids": [1, 2, 3], "fields": ["first_name", "last_name"]} (fields optionnel)
+#Réponse: {"users": {"1": {...}, "2": {...}}, "missing": [3]}
+@user_bp.route('/users/batch', methods = ['POST'])
+@jwt_required()
+def get_users_batch():
+    data = request.get_json(silent = True)
+    if not isinstance(data, dict):
+        return jsonify({"Erreur : " : "Le corps doit être un objet JSON"}), 400
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not all(
+        isinstance(user_id, int) and not isinstance(user_id, bool) for user_id in ids
+    ):
+        return jsonify({"Erreur : " : "ids doit être une liste d'identifiants"}), 400
+    if len(ids) > MAX_BATCH_IDS:
+        return jsonify({"Erreur : " : f"Au plus {MAX_BATCH_IDS} utilisateurs par requête"}), 400
+    is_admin = int(get_jwt_identity()) in current_app.config.get("ADMIN_USER_IDS", set())
+    try:
+        fields = parse_fields(data.get('fields'), tuple(PUBLIC_FIELDS) if is_admin else UNRESTRICTED_FIELDS)
+    except ValueError as e:
+        return jsonify({"Erreur : " : str(e)}), 400
+
+    ids = list(dict.fromkeys(ids))
+    rows = project(User.query.filter(User.id.in_(ids)), fields).all() if ids else []
+    users = {str(row.id): row_to_dict(row, fields) for row in rows}
+    return jsonify({
+        "users": users,
+        "missing": [user_id for user_id in ids if str(user_id) not in users]
+    }), 200
 
 @user_bp.route('/users/register', methods = ['POST'])
 def register_user():
@@ -40,6 +150,9 @@ def register_user():
         db.session.commit()
         return jsonify(new_user.to_dict()), 201
     
+    except HashingPoolSaturated:
+        db.session.rollback()
+        return too_busy()
     except ValueError as e:
         return jsonify({"Erreur : " : f"Erreur lors de la création de l'utilisateur {e}"}), 400
     
@@ -63,8 +176,12 @@ def update_user(user_id):
             user.password = data["password"]
 
         db.session.commit()
+        profile_cache.invalidate(user_id)
         return jsonify(user.to_dict())
 
+    except HashingPoolSaturated:
+        db.session.rollback()
+        return too_busy()
     except ValueError as e:
         return jsonify({"Erreur : " : f"Erreur lors de la mise à jour"}), 400
     except Exception as e:
@@ -77,6 +194,7 @@ def delete_user(user_id):
     try:
         db.session.delete(user)
         db.session.commit()
+        profile_cache.invalidate(user_id)
 
         return jsonify({"Message : " : "Utilisateur effacé avec succés"}), 200 
     except Exception as e:
@@ -93,9 +211,23 @@ def login_user():
         return jsonify({"Erreur : " : "Veuillez fournir votre email et votre mot de passe"}), 400
     
     user = User.query.filter_by(email = email).first()
-    if not user or not user.check_password(password):
+    try:
+        valid = user is not None and user.check_password(password)
+    except HashingPoolSaturated:
+        return too_busy()
+    if not valid:
         return jsonify({"Erreur : " : "Email ou mot de passe incorrect"}), 401
     
+    # Hash calculé avec d'anciens paramètres : recalculé avec la configuration courante
+    # (sans bloquer la connexion si le pool est saturé ou l'écriture échoue)
+    if user.needs_rehash():
+        try:
+            user.password = password
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.warning(f"Rehash du mot de passe de l'utilisateur {user.id} échoué: {e}")
+    
     access_token = create_access_token(identity=str(user.id))
     return_response = {
         "access_token" : access_token,
@@ -106,10 +238,10 @@ def login_user():
 @user_bp.route("/users/me", methods = ["GET"])
 @jwt_required()
 def current_user():
-    user_id = get_jwt_identity()
-    user = User.query.get_or_404(int(user_id))
-
-    if not user:
-        return jsonify({"Erreur : " : "Utilisateur non trouvé"}), 404
-
-    return jsonify(user.to_dict()), 200
\ No newline at end of file
+    user_id = int(get_jwt_identity())
+    generation = profile_cache.generation
+    cached = profile_cache.get(user_id)
+    if cached is None:
+        user = User.query.get_or_404(user_id)
+        cached = profile_cache.set(user_id, user.to_dict(), generation)
+    return profile_response(*cached)
\ No newline at end of file